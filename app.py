@@ -2,21 +2,19 @@
 Flask Web应用，用于展示爬取的新闻数据
 """
 import os
+import gzip
 import asyncio
-import json
-import glob
 import logging
 from datetime import datetime, timedelta
-from flask import Flask, render_template, jsonify, request, send_file
-from news_crawler.scrapers.foxnews_scraper import FoxNewsScraper
-from news_crawler.scrapers.nytimes_scraper import NYTimesScraper
-from news_crawler.scrapers.washingtonpost_scraper import WashingtonPostScraper
-from news_crawler.scrapers.cnn_scraper import CNNScraper
-from news_crawler.scrapers.bbc_scraper import BBCScraper
-from news_crawler.scrapers.wsj_scraper import WSJScraper
+from flask import Flask, Response, render_template, jsonify, request
+from news_crawler.scrapers.registry import SCRAPERS
 from news_crawler.config.config import CRAWLER_CONFIG, NEWS_SITES
-import pandas as pd
-from io import BytesIO
+from news_crawler.utils.job_manager import get_job_manager
+from news_crawler.utils.storage import get_storage
+from news_crawler.utils.news_reader import get_reader
+from news_crawler.utils.news_query import NewsQuery, QueryError, decode_cursor, encode_cursor
+from news_crawler.utils.search_index import SearchError, get_search_index
+from news_crawler.utils.snapshot_store import get_snapshot_store
 
 # 配置日志
 logging.basicConfig(
@@ -34,16 +32,6 @@ app = Flask(__name__)
 # 确保数据目录存在
 os.makedirs(CRAWLER_CONFIG["save_path"], exist_ok=True)
 
-# 爬虫类映射
-SCRAPERS = {
-    "foxnews": FoxNewsScraper,
-    "nytimes": NYTimesScraper,
-    "washingtonpost": WashingtonPostScraper,
-    "cnn": CNNScraper,
-    "bbc": BBCScraper,
-    "wsj": WSJScraper
-}
-
 @app.route('/')
 def index():
     """首页"""
@@ -59,106 +47,188 @@ def light():
     """浅色风格首页"""
     return render_template('light.html', news_sites=NEWS_SITES)
 
+def submit_crawl_job(site):
+    """根据网站参数创建爬取任务，相同参数的任务运行期间会复用同一个任务"""
+    if site == 'all':
+        return get_job_manager().submit(site, SCRAPERS)
+    if site in SCRAPERS:
+        return get_job_manager().submit(site, SCRAPERS.select([site]))
+    return None, False
+
+def resolve_sites(site):
+    """将网站参数转换为网站ID列表，site 为 all 时返回所有网站，网站无效时返回 None"""
+    if site == 'all':
+        return list(SCRAPERS.keys())
+    if site in SCRAPERS:
+        return [site]
+    return None
+
 @app.route('/api/scrape')
-async def scrape():
-    """执行爬虫任务"""
+def scrape():
+    """创建后台爬虫任务并立即返回任务ID"""
     try:
         site = request.args.get('site', 'all')
-        results = []
         
         logger.info(f"开始爬取网站: {site}")
         
-        if site == 'all':
-            # 爬取所有网站
-            for site_id, scraper_class in SCRAPERS.items():
-                try:
-                    logger.info(f"爬取网站: {site_id}")
-                    scraper = scraper_class()
-                    articles = await scraper.scrape()
-                    results.extend(articles)
-                    logger.info(f"成功爬取 {site_id}: {len(articles)} 条新闻")
-                except Exception as e:
-                    logger.error(f"爬取 {site_id} 失败: {str(e)}")
-        elif site in SCRAPERS:
-            # 爬取指定网站
-            try:
-                scraper = SCRAPERS[site]()
-                results = await scraper.scrape()
-                logger.info(f"成功爬取 {site}: {len(results)} 条新闻")
-            except Exception as e:
-                logger.error(f"爬取 {site} 失败: {str(e)}")
-                return jsonify({"status": "error", "message": f"爬取 {site} 失败: {str(e)}"})
-        else:
+        job, created = submit_crawl_job(site)
+        if job is None:
             logger.error(f"无效的网站: {site}")
             return jsonify({"status": "error", "message": "无效的网站"})
         
-        return jsonify({"status": "success", "count": len(results)})
+        return jsonify({"status": "success", "job_id": job.id, "created": created, "job": job.to_dict()})
     except Exception as e:
-        logger.error(f"爬取失败: {str(e)}")
+        logger.error(f"创建爬取任务失败: {str(e)}")
         return jsonify({"status": "error", "message": str(e)})
 
+@app.route('/api/jobs', methods=['GET', 'POST'])
+def jobs():
+    """POST 创建爬取任务，GET 列出最近的任务"""
+    try:
+        if request.method == 'GET':
+            return jsonify({"status": "success", "jobs": get_job_manager().list_jobs()})
+        
+        payload = request.get_json(silent=True) or {}
+        site = payload.get('site') or request.args.get('site', 'all')
+        job, created = submit_crawl_job(site)
+        if job is None:
+            return jsonify({"status": "error", "message": "无效的网站"}), 400
+        
+        return jsonify({"status": "success", "job_id": job.id, "created": created, "job": job.to_dict()}), 202
+    except Exception as e:
+        logger.error(f"处理爬取任务请求失败: {str(e)}")
+        return jsonify({"status": "error", "message": str(e)})
+
+@app.route('/api/jobs/<job_id>', methods=['GET', 'DELETE'])
+def job_detail(job_id):
+    """GET 查询任务进度，DELETE 取消任务"""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "任务不存在"}), 404
+    
+    if request.method == 'DELETE':
+        cancelled = get_job_manager().cancel(job_id)
+        return jsonify({"status": "success", "cancelled": cancelled, "job": job.to_dict()})
+    
+    return jsonify({"status": "success", "job": job.to_dict()})
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """取消任务"""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "任务不存在"}), 404
+    
+    cancelled = get_job_manager().cancel(job_id)
+    return jsonify({"status": "success", "cancelled": cancelled, "job": job.to_dict()})
+
 @app.route('/api/news')
 async def get_news():
-    """获取新闻列表"""
+    """获取新闻列表
+
+    支持的查询参数:
+        site, date                 网站和日期
+        limit, cursor              分页，cursor 为上一页返回的 next_cursor；不传 limit 时返回全部
+        fields                     逗号分隔的返回字段，例如 fields=title,url,importance；
+                                   包含 cluster_id、cluster_size 时返回文章所属的故事
+        source                     逗号分隔的来源
+        url                        只返回该URL的文章，例如列表不请求正文时用 fields=content&url=... 获取单篇正文
+        is_top_news                true/false
+        since, until               发布时间范围
+        dedupe                     true 时同一故事（跨站点的相似报道）只返回最重要的一篇，并附带故事字段
+    """
     try:
         site = request.args.get('site', 'all')
         date = request.args.get('date', None)  # 新增日期参数
         
         logger.info(f"获取新闻列表: 网站={site}, 日期={date}")
         
-        news = []
+        site_ids = resolve_sites(site)
+        if site_ids is None:
+            logger.error(f"无效的网站: {site}")
+            return jsonify({"status": "error", "message": "无效的网站"})
         
-        if site == 'all':
-            # 获取所有网站的新闻文件
-            for site_id, scraper_class in SCRAPERS.items():
-                try:
-                    scraper = scraper_class()
-                    logger.info(f"尝试获取 {site_id} 的新闻文件")
-                    if date:
-                        # 获取指定日期的新闻
-                        json_file = scraper.get_json_file_by_date(date)
-                    else:
-                        # 获取最新的新闻
-                        json_file = scraper.get_latest_json_file()
-                    
-                    if json_file:
-                        logger.info(f"{site_id} 的JSON文件: {json_file}")
-                        site_news = scraper.get_articles_from_file(json_file)
-                        logger.info(f"从 {site_id} 读取到 {len(site_news)} 条新闻")
-                        news.extend(site_news)
-                except Exception as e:
-                    logger.error(f"获取 {site_id} 新闻失败: {str(e)}")
-        else:
-            # 获取指定网站的新闻文件
-            if site in SCRAPERS:
-                scraper = SCRAPERS[site]()
-                logger.info(f"尝试获取 {site} 的新闻文件")
-                if date:
-                    # 获取指定日期的新闻
-                    json_file = scraper.get_json_file_by_date(date)
-                else:
-                    # 获取最新的新闻
-                    json_file = scraper.get_latest_json_file()
-                
-                if json_file:
-                    logger.info(f"{site} 的JSON文件: {json_file}")
-                    news = scraper.get_articles_from_file(json_file)
-                    logger.info(f"从 {site} 读取到 {len(news)} 条新闻")
-            else:
-                logger.error(f"无效的网站: {site}")
-                return jsonify({"status": "error", "message": "无效的网站"})
+        try:
+            query = NewsQuery.from_args(
+                request.args,
+                [get_reader(site_id).name for site_id in site_ids],
+                CRAWLER_CONFIG.get("api", {}).get("max_limit", 500)
+            )
+        except QueryError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
         
-        # 按重要性排序
-        news.sort(key=lambda x: x.get("importance", 0), reverse=True)
+        # 按重要性排序（每个网站的列表已预先排序）
+        result = query.execute()
         
-        logger.info(f"获取到 {len(news)} 条新闻")
-        return jsonify({"status": "success", "news": news})
+        logger.info(f"获取到 {len(result['news'])}/{result['total']} 条新闻")
+        return jsonify({"status": "success", **result})
     except Exception as e:
         logger.error(f"获取新闻列表失败: {str(e)}")
         import traceback
         logger.error(traceback.format_exc())
         return jsonify({"status": "error", "message": str(e)})
 
+@app.route('/api/search')
+async def search_news():
+    """全文搜索新闻标题、摘要和正文，按BM25相关度排序
+
+    支持的查询参数:
+        q                          搜索词，所有词都必须出现；"..." 按短语匹配，词尾加 * 按前缀匹配
+                                   返回的 title 和 snippet 已转义HTML，只包含命中词的 <mark> 标签
+        site                       网站，默认 all
+        source                     逗号分隔的来源
+        date 或 start, end         爬取日期（YYYYMMDD），start/end 包含两端
+        limit, cursor              分页，cursor 为上一页返回的 next_cursor
+    """
+    try:
+        query = request.args.get('q', '')
+        site = request.args.get('site', 'all')
+        date = request.args.get('date') or None
+        start = date or request.args.get('start') or None
+        end = date or request.args.get('end') or None
+        logger.info(f"搜索新闻: q={query}, 网站={site}, 日期={date or f'{start}-{end}'}")
+        
+        search_index = get_search_index()
+        if search_index is None:
+            return jsonify({"status": "error", "message": "搜索功能未启用"})
+        site_ids = resolve_sites(site)
+        if site_ids is None:
+            return jsonify({"status": "error", "message": "无效的网站"})
+        
+        search_config = CRAWLER_CONFIG.get("search", {})
+        try:
+            for value in (start, end):
+                if value is not None:
+                    datetime.strptime(value, '%Y%m%d')
+        except ValueError:
+            return jsonify({"status": "error", "message": "无效的日期，格式应为YYYYMMDD"}), 400
+        try:
+            limit = max(1, min(int(request.args.get('limit', 20)), search_config.get("max_limit", 100)))
+            offset = decode_cursor(request.args.get('cursor'))
+            sources = [item.strip() for item in request.args.get('source', '').split(',') if item.strip()]
+            result = search_index.search(
+                query,
+                sites=None if site == 'all' else [get_reader(site_id).name for site_id in site_ids],
+                sources=sources or None,
+                start=start,
+                end=end,
+                limit=limit,
+                offset=offset
+            )
+        except ValueError as e:
+            # SearchError、QueryError 和无效的 limit
+            message = str(e) if isinstance(e, (SearchError, QueryError)) else "无效的limit"
+            return jsonify({"status": "error", "message": message}), 400
+        
+        next_cursor = encode_cursor(offset + len(result["results"])) if result["has_more"] else None
+        logger.info(f"搜索到 {len(result['results'])} 条结果")
+        return jsonify({"status": "success", "results": result["results"], "next_cursor": next_cursor})
+    except Exception as e:
+        logger.error(f"搜索新闻失败: {str(e)}")
+        import traceback
+        logger.error(traceback.format_exc())
+        return jsonify({"status": "error", "message": str(e)})
+
 @app.route('/api/dates')
 async def get_available_dates():
     """获取可用的新闻日期列表"""
@@ -167,60 +237,54 @@ async def get_available_dates():
         
         logger.info(f"获取可用日期: {site}")
         
-        dates = set()
-        
         if site == 'all':
-            # 获取所有网站的日期
-            for site_id, scraper_class in SCRAPERS.items():
-                try:
-                    scraper = scraper_class()
-                    site_dates = scraper.get_available_dates()
-                    dates.update(site_dates)
-                except Exception as e:
-                    logger.error(f"获取 {site_id} 日期失败: {str(e)}")
+            # 所有网站的日期
+            date_list = get_storage().dates()
+        elif site in SCRAPERS:
+            # 指定网站的日期
+            date_list = get_reader(site).dates()
         else:
-            # 获取指定网站的日期
-            if site in SCRAPERS:
-                scraper = SCRAPERS[site]()
-                dates = scraper.get_available_dates()
-            else:
-                logger.error(f"无效的网站: {site}")
-                return jsonify({"status": "error", "message": "无效的网站"})
-        
-        # 将日期转换为列表并排序（最新的日期在前）
-        date_list = sorted(list(dates), reverse=True)
+            logger.error(f"无效的网站: {site}")
+            return jsonify({"status": "error", "message": "无效的网站"})
         
         return jsonify({"status": "success", "dates": date_list})
     except Exception as e:
         logger.error(f"获取可用日期失败: {str(e)}")
         return jsonify({"status": "error", "message": str(e)})
 
+@app.route('/api/snapshot/<digest>')
+def get_snapshot(digest):
+    """按哈希获取文章卡片的原始HTML快照"""
+    data = get_snapshot_store().get_compressed(digest)
+    if data is None:
+        return jsonify({"status": "error", "message": "快照不存在"}), 404
+    
+    # 快照按gzip保存，客户端支持时直接返回压缩内容
+    if 'gzip' in request.accept_encodings:
+        response = Response(data, mimetype='text/html')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(gzip.decompress(data), mimetype='text/html')
+    # 快照按内容寻址，内容不会变化
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
 @app.route('/api/status')
 def status():
     """获取爬虫状态"""
     try:
-        # 获取所有JSON文件
-        json_files = glob.glob(os.path.join(CRAWLER_CONFIG["save_path"], "*.json"))
-        
-        # 统计每个网站的文章数量
+        # 统计每个网站最新一天的文章数量
         site_counts = {}
         total_count = 0
+        last_update = None
         
         for site_id in SCRAPERS.keys():
-            site_files = [f for f in json_files if f.startswith(os.path.join(CRAWLER_CONFIG["save_path"], site_id.lower()))]
-            
-            if site_files:
-                # 获取最新的文件
-                latest_file = max(site_files, key=os.path.getmtime)
-                
-                try:
-                    with open(latest_file, 'r', encoding='utf-8') as f:
-                        articles = json.load(f)
-                        site_counts[site_id] = len(articles)
-                        total_count += len(articles)
-                except Exception as e:
-                    logger.error(f"读取JSON文件失败: {str(e)}")
-                    site_counts[site_id] = 0
+            latest = get_reader(site_id).latest()
+            if latest:
+                site_counts[site_id] = latest["count"]
+                total_count += latest["count"]
+                last_update = max(last_update or latest["updated_at"], latest["updated_at"])
             else:
                 site_counts[site_id] = 0
         
@@ -229,7 +293,7 @@ def status():
             "total_count": total_count,
             "site_counts": site_counts,
             "sites": list(SCRAPERS.keys()),
-            "last_update": datetime.now().isoformat()
+            "last_update": last_update
         })
     except Exception as e:
         logger.error(f"获取状态失败: {str(e)}")
@@ -237,88 +301,48 @@ def status():
 
 @app.route('/api/export')
 async def export_news():
-    """导出新闻数据为Excel"""
+    """导出新闻数据
+
+    支持的查询参数:
+        site               网站
+        date               日期；或使用 start、end（YYYYMMDD）导出日期范围
+        format             xlsx（默认）、csv 或 ndjson
+    """
+    # openpyxl 导入较慢，只在导出时加载
+    from news_crawler.utils.news_export import (
+        EXPORT_FORMATS, iter_export_articles, peek, resolve_dates, stream_export
+    )
+    
     try:
         site = request.args.get('site', 'all')
         date = request.args.get('date', None)  # 新增日期参数
-        logger.info(f"导出新闻数据: 网站={site}, 日期={date}")
-        
-        news = []
+        start = request.args.get('start', None)
+        end = request.args.get('end', None)
+        export_format = request.args.get('format', 'xlsx').lower()
+        logger.info(f"导出新闻数据: 网站={site}, 日期={date or f'{start}-{end}'}, 格式={export_format}")
         
-        if site == 'all':
-            # 获取所有网站的新闻文件
-            for site_id, scraper_class in SCRAPERS.items():
-                try:
-                    scraper = scraper_class()
-                    if date:
-                        # 获取指定日期的新闻
-                        json_file = scraper.get_json_file_by_date(date)
-                    else:
-                        # 获取最新的新闻
-                        json_file = scraper.get_latest_json_file()
-                    
-                    if json_file:
-                        site_news = scraper.get_articles_from_file(json_file)
-                        news.extend(site_news)
-                except Exception as e:
-                    logger.error(f"获取 {site_id} 新闻失败: {str(e)}")
-        else:
-            # 获取指定网站的新闻文件
-            if site in SCRAPERS:
-                scraper = SCRAPERS[site]()
-                if date:
-                    # 获取指定日期的新闻
-                    json_file = scraper.get_json_file_by_date(date)
-                else:
-                    # 获取最新的新闻
-                    json_file = scraper.get_latest_json_file()
-                
-                if json_file:
-                    news = scraper.get_articles_from_file(json_file)
-            else:
-                return jsonify({"status": "error", "message": "无效的网站"})
+        site_ids = resolve_sites(site)
+        if site_ids is None:
+            return jsonify({"status": "error", "message": "无效的网站"})
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({"status": "error", "message": "无效的导出格式"})
         
-        if not news:
+        site_names = [get_reader(site_id).name for site_id in site_ids]
+        dates = resolve_dates(site_names, date, start, end)
+        first, articles = peek(iter_export_articles(site_names, dates))
+        if first is None:
             return jsonify({"status": "error", "message": "没有找到新闻数据"})
         
-        # 创建DataFrame
-        df = pd.DataFrame(news)
-        
-        # 选择要导出的列
-        columns = ['title', 'url', 'summary', 'content', 'publish_time', 'crawl_time', 'source', 'is_top_news']
-        df = df[columns]
-        
-        # 重命名列
-        column_names = {
-            'title': '标题',
-            'url': '链接',
-            'summary': '摘要',
-            'content': '内容',
-            'publish_time': '发布时间',
-            'crawl_time': '抓取时间',
-            'source': '来源',
-            'is_top_news': '是否头条'
-        }
-        df = df.rename(columns=column_names)
-        
-        # 创建Excel文件
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='新闻数据')
-        
-        output.seek(0)
-        
         # 生成文件名
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        date_str = date if date else "latest"
-        filename = f"news_data_{site}_{date_str}_{timestamp}.xlsx"
+        date_str = date or (f"{start or ''}-{end or ''}" if start or end else "latest")
+        mimetype, extension = EXPORT_FORMATS[export_format]
+        filename = f"news_data_{site}_{date_str}_{timestamp}.{extension}"
         
-        return send_file(
-            output,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            as_attachment=True,
-            download_name=filename
-        )
+        # 响应体为生成器，逐块发送（chunked）
+        response = Response(stream_export(articles, export_format), mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
         
     except Exception as e:
         logger.error(f"导出新闻数据失败: {str(e)}")
@@ -0,0 +1,78 @@
+"""
+故事聚类性能基准，使用合成文章测量签名计算和聚类的耗时
+
+生成 --articles 篇随机文章，其中 --duplicates 篇是已有文章截断并改写结尾后的近似副本，
+分别测量保存时计算MinHash签名的耗时（每篇）和对所有签名聚类的耗时（取中位数），
+并检查近似副本是否都与原文归入同一个故事。聚类耗时超过预算（--budget-ms）时返回非零退出码。
+
+用法:
+    python benchmarks/cluster_benchmark.py
+    python benchmarks/cluster_benchmark.py --articles 5000 --duplicates 1000 -n 5
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from news_crawler.utils.story_clusters import StoryClusterer, compute_signature
+
+VOCABULARY = [f"word{i}" for i in range(5000)]
+
+
+def make_articles(count, duplicates, words, seed=0):
+    rng = random.Random(seed)
+    articles = [{"title": " ".join(rng.choice(VOCABULARY) for _ in range(8)),
+                 "content": " ".join(rng.choice(VOCABULARY) for _ in range(words))}
+                for _ in range(count)]
+    for original in articles[:duplicates]:
+        content = original["content"].split()
+        # 近似副本: 换一个标题，保留前80%的正文并追加一句
+        articles.append({
+            "title": " ".join(rng.choice(VOCABULARY) for _ in range(8)),
+            "content": " ".join(content[:int(len(content) * 0.8)]) + " staff writers contributed to this report"
+        })
+    return articles
+
+
+def main():
+    parser = argparse.ArgumentParser(description="故事聚类性能基准")
+    parser.add_argument("--articles", type=int, default=3000, help="不重复的文章数")
+    parser.add_argument("--duplicates", type=int, default=500, help="近似副本数")
+    parser.add_argument("--words", type=int, default=300, help="每篇文章的词数")
+    parser.add_argument("-n", "--repeat", type=int, default=5, help="聚类的重复次数")
+    parser.add_argument("--budget-ms", type=float, default=200, help="聚类耗时预算（毫秒，取中位数）")
+    args = parser.parse_args()
+
+    articles = make_articles(args.articles, min(args.duplicates, args.articles), args.words)
+    start = time.perf_counter()
+    signatures = [compute_signature(article) for article in articles]
+    sign_ms = (time.perf_counter() - start) * 1000 / len(articles)
+
+    clusterer = StoryClusterer()
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        roots = clusterer.cluster(signatures)
+        timings.append((time.perf_counter() - start) * 1000)
+    cluster_ms = statistics.median(timings)
+
+    missed = sum(1 for index in range(args.articles, len(articles))
+                 if roots[index] != roots[index - args.articles])
+    print(f"签名: {sign_ms:.2f} ms/篇")
+    print(f"聚类 {len(signatures)} 篇: 中位数 {cluster_ms:.1f} ms（{args.repeat} 次），"
+          f"{len(set(roots))} 个故事，{missed} 个近似副本未归入原文的故事")
+
+    if cluster_ms > args.budget_ms:
+        print(f"\n失败: 聚类耗时 {cluster_ms:.1f} ms 超过预算 {args.budget_ms:.0f} ms")
+        return 1
+    print("\n通过")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+启动导入耗时基准，基于 python -X importtime 测量 Web 应用的冷启动导入时间
+
+每次在新的解释器进程中导入目标模块，取多次运行的中位数。以下情况返回非零退出码：
+    导入耗时超过预算（--budget-ms）
+    启动时加载了只应在爬取或导出时才用到的重量级模块（--forbid）
+
+用法:
+    python benchmarks/import_benchmark.py                     # 测量 app 的导入耗时
+    python benchmarks/import_benchmark.py --budget-ms 300 -n 10
+    python benchmarks/import_benchmark.py --module news_crawler.utils.storage --top 20
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 启动时不应加载的模块：爬虫、浏览器和导出相关的依赖
+HEAVY_MODULES = ["bs4", "aiohttp", "playwright", "feedparser", "openpyxl", "pandas", "lxml"]
+
+LINE_PATTERN = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def run_once(module, workdir):
+    """在新进程中导入模块，返回 {模块名: (自身耗时us, 累计耗时us, 层级)}"""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=workdir, env=env, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败:\n{completed.stderr[-2000:]}")
+
+    timings = {}
+    for line in completed.stderr.splitlines():
+        match = LINE_PATTERN.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            timings[name] = (int(own), int(cumulative), len(indent) // 2)
+    return timings
+
+
+def measure(module, repeat):
+    # 应用启动时会在当前目录创建日志和数据目录，放到临时目录中
+    with tempfile.TemporaryDirectory() as workdir:
+        # 预热一次，生成字节码缓存
+        run_once(module, workdir)
+        runs = [run_once(module, workdir) for _ in range(repeat)]
+    totals = [timings[module][1] / 1000 for timings in runs]
+    return statistics.median(totals), runs[-1]
+
+
+def print_top(timings, top):
+    """打印累计耗时最多的直接依赖"""
+    direct = [(cumulative, name) for name, (_, cumulative, level) in timings.items() if level == 1]
+    print(f"\n耗时最多的 {top} 个直接导入:")
+    for cumulative, name in sorted(direct, reverse=True)[:top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动导入耗时基准")
+    parser.add_argument("--module", default="app", help="要导入的模块")
+    parser.add_argument("-n", "--repeat", type=int, default=5, help="重复次数")
+    parser.add_argument("--budget-ms", type=float, default=400, help="导入耗时预算（毫秒，取中位数）")
+    parser.add_argument("--forbid", nargs="*", default=HEAVY_MODULES, help="启动时不允许加载的模块")
+    parser.add_argument("--top", type=int, default=10, help="显示耗时最多的导入数量")
+    args = parser.parse_args()
+
+    median_ms, timings = measure(args.module, args.repeat)
+    print(f"导入 {args.module}: 中位数 {median_ms:.1f} ms（{args.repeat} 次），预算 {args.budget_ms:.0f} ms")
+    print_top(timings, args.top)
+
+    failed = False
+    loaded = [name for name in args.forbid if name in timings]
+    if loaded:
+        print(f"\n失败: 启动时加载了重量级模块: {', '.join(loaded)}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print(f"\n失败: 导入耗时 {median_ms:.1f} ms 超过预算 {args.budget_ms:.0f} ms")
+        failed = True
+    if not failed:
+        print("\n通过")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
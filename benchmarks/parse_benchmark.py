@@ -0,0 +1,241 @@
+"""
+离线解析性能基准，使用仓库中保存的 *_debug.html 页面快照测量各站点的提取路径
+
+网络请求全部替换为读取快照，测量以下阶段的耗时和峰值内存：
+    parse    构建文档树
+    list     parse_article_list 提取头条和普通文章列表
+    scrape   完整的 scrape() 流程（首页中的选择器循环 + 正文提取），返回提取到的文章数
+    content  fetch_article_content 提取文章正文（仅限有文章页快照的站点）
+
+峰值内存由 tracemalloc 统计，只包含Python层面的分配，lxml后端在C层构建的文档树不计入。
+
+用法:
+    python benchmarks/parse_benchmark.py                      # 运行全部站点并保存结果
+    python benchmarks/parse_benchmark.py --sites cnn bbc -n 5
+    python benchmarks/parse_benchmark.py --compare old.json new.json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from news_crawler.config.config import CRAWLER_CONFIG
+from news_crawler.utils.document_cache import release_document
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+# 站点ID -> (爬虫模块, 爬虫类, 首页快照, 文章页快照)
+FIXTURES = {
+    "nytimes": ("news_crawler.scrapers.nytimes_scraper", "NYTimesScraper", "nytimes_debug.html", None),
+    "washingtonpost": ("news_crawler.scrapers.washingtonpost_scraper", "WashingtonPostScraper", "washingtonpost_debug.html", None),
+    "foxnews": ("news_crawler.scrapers.foxnews_scraper", "FoxNewsScraper", "foxnews_debug.html", None),
+    "cnn": ("news_crawler.scrapers.cnn_scraper", "CNNScraper", "cnn_debug.html", None),
+    "bbc": ("news_crawler.scrapers.bbc_scraper", "BBCScraper", "bbc_debug.html", "bbc_article_debug_1.html"),
+}
+
+
+def read_fixture(name):
+    if not name:
+        return ""
+    with open(os.path.join(ROOT, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def disable_throttling():
+    """基准测试只测量解析，关闭随机延迟和抓取限速"""
+    CRAWLER_CONFIG["random_delay"] = {"enabled": False, "min": 0, "max": 0}
+    CRAWLER_CONFIG["fetch_scheduler"] = dict(
+        CRAWLER_CONFIG.get("fetch_scheduler", {}), requests_per_second=1e9, burst=1e9
+    )
+
+
+def build_scraper(site_id, homepage_html, article_html):
+    """创建爬虫实例，并将网络请求和文件保存替换为快照读取"""
+    module_name, class_name, _, _ = FIXTURES[site_id]
+    module = __import__(module_name, fromlist=[class_name])
+    scraper = getattr(module, class_name)()
+
+    async def fetch_page(url, *args, **kwargs):
+        if url.rstrip("/") == scraper.site_config["url"].rstrip("/"):
+            return homepage_html
+        return article_html
+
+    async def initialize():
+        pass
+
+    scraper.fetch_page = fetch_page
+    scraper.initialize = initialize
+    scraper.save_to_json = lambda articles: None
+    return scraper
+
+
+def measure(func, repeat):
+    """运行 repeat 次，返回耗时统计、峰值内存和最后一次的返回值"""
+    timings = []
+    peak = 0
+    result = None
+    for _ in range(repeat):
+        tracemalloc.start()
+        started_at = time.perf_counter()
+        # 爬虫会打印大量调试信息，计时期间丢弃输出
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = func()
+        timings.append(time.perf_counter() - started_at)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return {
+        "min": round(min(timings), 4),
+        "median": round(statistics.median(timings), 4),
+        "peak_memory_kb": peak // 1024,
+    }, result
+
+
+def bench_site(site_id, repeat):
+    _, _, homepage_name, article_name = FIXTURES[site_id]
+    homepage_html = read_fixture(homepage_name)
+    article_html = read_fixture(article_name)
+    scraper = build_scraper(site_id, homepage_html, article_html)
+    backend = scraper.document_backend
+    stages = {}
+
+    def parse():
+        backend.parse(homepage_html)
+        release_document(homepage_html)
+
+    def parse_list():
+        articles = scraper.parse_article_list(homepage_html, is_top_news=True)
+        articles += scraper.parse_article_list(homepage_html, is_top_news=False)
+        release_document(homepage_html)
+        return len(articles)
+
+    def scrape():
+        return len(asyncio.run(scraper.scrape()) or [])
+
+    stages["parse"], _ = measure(parse, repeat)
+    stages["list"], list_count = measure(parse_list, repeat)
+    stages["list"]["articles"] = list_count
+    stages["scrape"], scrape_count = measure(scrape, repeat)
+    stages["scrape"]["articles"] = scrape_count
+
+    if article_html:
+        def content():
+            text = asyncio.run(scraper.fetch_article_content("https://example.com/article"))
+            release_document(article_html)
+            return len(text or "")
+        stages["content"], content_length = measure(content, repeat)
+        stages["content"]["chars"] = content_length
+
+    return {
+        "fixture": homepage_name,
+        "size_kb": len(homepage_html.encode("utf-8")) // 1024,
+        "backend": backend.name,
+        "stages": stages,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return ""
+
+
+def run(site_ids, repeat):
+    disable_throttling()
+    results = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "repeat": repeat,
+        "sites": {},
+    }
+    # 爬虫会在当前目录写调试文件，放到临时目录中避免覆盖快照
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            for site_id in site_ids:
+                print(f"测试 {site_id}...")
+                results["sites"][site_id] = bench_site(site_id, repeat)
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def print_results(results):
+    print(f"{'站点':<16}{'阶段':<10}{'中位耗时(s)':>12}{'最短耗时(s)':>12}{'峰值内存(KB)':>14}{'文章数/字数':>12}")
+    for site_id, site in results["sites"].items():
+        for stage, data in site["stages"].items():
+            print(f"{site_id:<16}{stage:<10}{data['median']:>12.4f}{data['min']:>12.4f}"
+                  f"{data['peak_memory_kb']:>14}{data.get('articles', data.get('chars', '')):>12}")
+
+
+def compare(old_path, new_path):
+    """比较两次基准结果，输出各阶段耗时和内存的变化"""
+    with open(old_path, "r", encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, "r", encoding="utf-8") as f:
+        new = json.load(f)
+
+    def change(before, after):
+        return f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+
+    print(f"{old.get('revision', old_path)} -> {new.get('revision', new_path)}")
+    print(f"{'站点':<16}{'阶段':<10}{'耗时':>24}{'变化':>10}{'峰值内存(KB)':>20}{'变化':>10}{'文章数':>10}")
+    for site_id, site in new["sites"].items():
+        old_site = old["sites"].get(site_id)
+        if not old_site:
+            continue
+        for stage, data in site["stages"].items():
+            before = old_site["stages"].get(stage)
+            if not before:
+                continue
+            articles = f"{before.get('articles', '')}->{data.get('articles', '')}" if "articles" in data else ""
+            print(f"{site_id:<16}{stage:<10}"
+                  f"{before['median']:>11.4f}->{data['median']:<11.4f}{change(before['median'], data['median']):>10}"
+                  f"{before['peak_memory_kb']:>9}->{data['peak_memory_kb']:<9}"
+                  f"{change(before['peak_memory_kb'], data['peak_memory_kb']):>10}{articles:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线解析性能基准")
+    parser.add_argument("--sites", nargs="+", choices=sorted(FIXTURES), default=list(FIXTURES), help="要测试的站点")
+    parser.add_argument("-n", "--repeat", type=int, default=3, help="每个阶段的重复次数")
+    parser.add_argument("-o", "--output", help="结果文件路径，默认保存到 benchmarks/results/")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="比较两个结果文件")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    results = run(args.sites, args.repeat)
+    print_results(results)
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        name = f"parse_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{results['revision'] or 'local'}.json"
+        output = os.path.join(RESULTS_DIR, name)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"结果已保存到 {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 """
 配置文件，包含新闻网站的URL和其他配置参数
 """
+import os
 
 # 新闻网站配置
 NEWS_SITES = {
@@ -26,7 +27,8 @@ NEWS_SITES = {
         "content_selector": "article p, .article-body p, .story-body p",  # 正文选择器
         "top_news_selector": "div.top-story, .main-content article, .main-stage article",  # 头条新闻选择器
         "requires_js": True,                                   # 需要JavaScript渲染
-        "use_proxy": True                                      # 使用代理
+        "use_proxy": True,                                     # 使用代理
+        "block_resources": ["image", "media", "font", "stylesheet"]  # 渲染时拦截的资源类型
     },
     "foxnews": {
         "name": "Fox News",
@@ -51,7 +53,8 @@ NEWS_SITES = {
         "top_news_selector": ".container_lead-plus-headlines__item--lead, .container_lead-package",
         "requires_js": False,  # 禁用 Playwright
         "wait_until": "domcontentloaded",
-        "timeout": 15000
+        "timeout": 15000,
+        "parser_backend": "lxml"  # 使用lxml后端解析文章页
     },
     'bbc': {
         'name': 'BBC News',
@@ -87,7 +90,8 @@ NEWS_SITES = {
         "random_delay": {
             "min": 1,
             "max": 3
-        }
+        },
+        "parser_backend": "lxml"  # 使用lxml后端解析文章页
     }
 }
 
@@ -110,9 +114,78 @@ CRAWLER_CONFIG = {
         "Sec-Fetch-User": "?1"
     },
     "timeout": 15,  # 减少超时时间到15秒
+    "http_pool": {  # 共享HTTP连接池配置
+        "limit": 100,             # 连接池总连接数上限
+        "limit_per_host": 10,     # 每个主机的连接数上限
+        "ttl_dns_cache": 300,     # DNS缓存时间（秒）
+        "keepalive_timeout": 30   # 空闲连接保持时间（秒）
+    },
+    "http_cache": {  # 磁盘HTTP缓存（ETag / Last-Modified 条件请求）
+        "enabled": True,
+        "path": os.environ.get("HTTP_CACHE_PATH"),  # 缓存数据库路径，默认为 news_crawler/data/http_cache.db
+        "max_bytes": 200 * 1024 * 1024,             # 压缩后正文的总大小上限
+        "max_entries": 5000,                        # 缓存条目数上限
+        "default_ttl": 0                            # 响应没有指定有效期时的缓存时间（秒），0表示每次都重新验证
+    },
+    "fetch_scheduler": {  # 文章正文并发抓取配置
+        "max_in_flight": 16,        # 全局同时在途请求数
+        "per_host": 4,              # 每个主机同时在途请求数
+        "requests_per_second": 2,   # 每个主机的令牌补充速率
+        "burst": 4                  # 每个主机的令牌桶容量
+    },
     "retry_times": 3,
     "retry_interval": 1,
     "save_path": "data",
+    "site_timeout": 300,  # 单个站点爬取超时（秒），可在站点配置中用crawl_timeout覆盖
+    "max_jobs": 50,       # 保留的后台爬取任务记录数
+    "document_cache_size": 4,  # 缓存的已解析HTML文档树数量
+    "article_cache_files": 32,  # 缓存的已解码文章文件数量，按日期范围导出时内存不会随天数增长
+    "parser_backend": "soup",  # 默认HTML解析后端（soup 或 lxml），可在站点配置中用parser_backend覆盖
+    "storage": {  # 文章存储配置
+        "engine": os.environ.get("STORAGE_ENGINE", "json"),  # 存储引擎: json、jsonl 或 sqlite
+        "db_path": os.environ.get("DB_PATH"),  # SQLite数据库路径，默认为 news_crawler/data/news.db
+        "batch_size": 500,                     # 每个写入事务的文章数
+        "jsonl": {  # 只追加JSONL存储配置
+            "fsync_every": 20,    # 累计写入多少篇文章后fsync
+            "fsync_interval": 5   # 距离上次fsync超过多少秒后fsync
+        }
+    },
+    "catalog": {  # 数据目录索引配置（秒）
+        "check_interval": 2,    # 检查数据目录是否变化的最小间隔
+        "rescan_interval": 60   # 强制重新扫描数据目录的间隔
+    },
+    "snapshots": {  # 文章原始HTML快照存储
+        "path": os.environ.get("SNAPSHOT_PATH"),  # 快照目录，默认为 news_crawler/data/snapshots
+        "compress_level": 6                       # gzip压缩级别
+    },
+    "incremental": {  # 增量爬取：复用最近已抓取的文章正文
+        "enabled": True,
+        "lookback_days": 2,  # 从最近几天保存的文章中查找（包括今天）
+        "ttl_hours": 24      # 正文抓取超过多少小时后重新抓取
+    },
+    "feeds": {  # RSS源采集配置
+        "state_dir": None,  # 源状态文件目录，默认为 news_crawler/data
+        "max_seen": 2000    # 每个源记录的已见条目GUID数量
+    },
+    "clustering": {  # 跨站点故事聚类（MinHash + LSH分段）
+        "enabled": True,    # 保存文章时是否计算签名，关闭后查询时再计算
+        "shingle_size": 3,  # 每个词组包含的词数
+        "max_words": 400,   # 每篇文章最多取前多少个词计算签名
+        "bands": 16,        # 签名分段数
+        "rows": 4,          # 每段的值个数，签名长度为 bands * rows
+        "threshold": 0.5,   # 估计的Jaccard相似度不低于该值视为同一故事
+        "max_dates": 8      # 最多缓存多少天的聚类结果
+    },
+    "search": {  # 全文搜索索引（SQLite FTS5）
+        "enabled": True,
+        "path": os.environ.get("SEARCH_INDEX_PATH"),  # 索引数据库路径，默认为 news_crawler/data/search.db
+        "max_candidates": 2000,  # 每次搜索最多对多少条最新的匹配结果排序
+        "snippet_tokens": 24,    # 摘录包含的词数
+        "max_limit": 100         # /api/search 每页最多返回的结果数
+    },
+    "api": {  # 接口配置
+        "max_limit": 500  # /api/news 每页最多返回的新闻数
+    },
     "max_news_per_site": 10,
     "use_proxy": False,
     "random_delay": {
@@ -128,6 +201,25 @@ CRAWLER_CONFIG = {
         "device_scale_factor": 1,
         "timeout": 30000,  # 30秒超时
         "wait_until": "domcontentloaded",  # 等待DOM加载完成即可
-        "ignore_https_errors": True
+        "ignore_https_errors": True,
+        "ready_timeout": 10000,  # 等待内容选择器出现的超时（毫秒）
+        "readiness": {  # 页面就绪检测配置（毫秒）
+            "dom_quiet_ms": 500,        # DOM无变更持续该时长视为渲染完成
+            "dom_quiet_timeout": 5000,  # 等待DOM静默的最长时间
+            "scroll_quiet_ms": 300,     # 每次滚动后等待懒加载的静默时长
+            "max_scrolls": 5            # 滚动次数上限
+        },
+        "block_resources": ["image", "media", "font"],  # 默认拦截的资源类型，可在站点配置中覆盖
+        "block_domains": [  # 默认拦截的广告和统计域名，可在站点配置中覆盖
+            "doubleclick.net", "googlesyndication.com", "googletagservices.com",
+            "google-analytics.com", "googletagmanager.com", "scorecardresearch.com",
+            "chartbeat.com", "chartbeat.net", "amazon-adsystem.com", "adnxs.com",
+            "facebook.net", "taboola.com", "outbrain.com", "criteo.com", "moatads.com"
+        ],
+        "pool": {  # 浏览器池配置
+            "headless": True,
+            "max_pages": 4,         # 同时打开的页面数上限
+            "max_navigations": 50   # 页面导航次数达到上限后回收重建
+        }
     }
 } 
\ No newline at end of file
@@ -1,8 +1,16 @@
-from .foxnews_scraper import FoxNewsScraper
-from .cnn_scraper import CNNScraper
-from .bbc_scraper import BBCScraper
-from .nytimes_scraper import NYTimesScraper
-from .washingtonpost_scraper import WashingtonPostScraper
+from .registry import SCRAPER_CLASSES, load_scraper_class
+
+# 爬虫类在首次访问时才导入，例如 from news_crawler.scrapers import CNNScraper
+_LAZY_CLASSES = {class_name: (module_name, class_name) for module_name, class_name in SCRAPER_CLASSES.values()}
+
+
+def __getattr__(name):
+    if name in _LAZY_CLASSES:
+        scraper_class = load_scraper_class(*_LAZY_CLASSES[name])
+        globals()[name] = scraper_class
+        return scraper_class
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     'FoxNewsScraper',
@@ -10,4 +18,4 @@ __all__ = [
     'BBCScraper',
     'NYTimesScraper',
     'WashingtonPostScraper'
-] 
\ No newline at end of file
+]
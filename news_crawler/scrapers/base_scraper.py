@@ -2,23 +2,28 @@
 基础爬虫类，提供通用的爬虫功能
 """
 import os
-import json
+import importlib.util
 import random
-import aiohttp
 import asyncio
 import re
 from datetime import datetime
-from bs4 import BeautifulSoup
 from typing import Dict, List, Optional
 from ..config.config import CRAWLER_CONFIG
 from ..utils.proxy_manager import ProxyManager
+from ..utils.http_client import get_http_client
+from ..utils.http_cache import CacheStats
+from ..utils.fetch_scheduler import get_fetch_scheduler
+from ..utils.browser_pool import get_browser_pool
+from ..utils.page_readiness import PageReadiness
+from ..utils.document_cache import release_document
+from ..utils.html_backend import get_backend
+from ..utils.news_reader import NewsReader
+from ..utils.storage import get_storage
+from ..utils.seen_index import get_seen_index, mark_fetched
+from ..utils.search_index import get_search_index
 
-# 尝试导入playwright，如果不可用则忽略
-try:
-    from playwright.async_api import async_playwright
-    PLAYWRIGHT_AVAILABLE = True
-except ImportError:
-    PLAYWRIGHT_AVAILABLE = False
+# 只检查playwright是否安装，不在导入时加载，浏览器池首次启动浏览器时才导入
+PLAYWRIGHT_AVAILABLE = importlib.util.find_spec("playwright") is not None
 
 class BaseScraper:
     def __init__(self, site_config: Dict):
@@ -33,6 +38,12 @@ class BaseScraper:
         self.requires_js = site_config.get("requires_js", False)
         self.delay_config = CRAWLER_CONFIG.get("random_delay", {"enabled": False, "min": 1, "max": 3})
         self.playwright_deps_missing = False
+        self.progress_callback = None  # 可选的进度回调，签名为 callback(event, **data)
+        self.readiness_timings = {}  # 各页面就绪等待耗时，按URL记录
+        self.cache_stats = CacheStats()  # 本次爬取的HTTP缓存命中统计
+        self.crawl_stats = {"reused": 0, "fetched": 0}  # 本次爬取复用和抓取的文章正文数量
+        self.document_backend = get_backend(site_config.get("parser_backend"))
+        self.reader = NewsReader(site_config)  # 已保存新闻的读取（文件查找逻辑不在爬虫中）
         
         if self.use_proxy:
             self.proxy_manager = ProxyManager()
@@ -62,17 +73,17 @@ class BaseScraper:
         
         for i in range(self.retry_times):
             try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(
-                        url, 
-                        headers=self.headers, 
-                        timeout=self.timeout,
-                        proxy=proxy
-                    ) as response:
-                        if response.status == 200:
-                            return await response.text()
-                        else:
-                            print(f"HTTP错误: {response.status} - {url}")
+                response = await get_http_client().get_cached(
+                    url, 
+                    headers=self.headers, 
+                    timeout=self.timeout,
+                    proxy=proxy,
+                    stats=self.cache_stats
+                )
+                if response.status == 200:
+                    return response.text
+                else:
+                    print(f"HTTP错误: {response.status} - {url}")
             except Exception as e:
                 print(f"请求失败 ({i+1}/{self.retry_times}): {str(e)} - {url}")
                 if i < self.retry_times - 1:
@@ -89,34 +100,47 @@ class BaseScraper:
             print("Playwright不可用，请安装playwright包")
             return None
         
+        playwright_config = CRAWLER_CONFIG.get("playwright", {})
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                context = await browser.new_context(
-                    user_agent=self.headers["User-Agent"],
-                    viewport={"width": 1920, "height": 1080}
-                )
-                page = await context.new_page()
-                
+            async with get_browser_pool().page(**self.get_blocking_config()) as page:
                 # 设置超时
                 page.set_default_timeout(self.timeout * 1000)
                 
-                # 导航到URL
-                await page.goto(url)
+                # 导航到URL，DOM就绪即可，不等待广告和统计请求全部结束
+                await page.goto(url, wait_until=playwright_config.get("wait_until", "domcontentloaded"))
                 
-                # 等待页面加载完成
-                await page.wait_for_load_state("networkidle")
+                # 等待内容选择器出现
+                await self.wait_for_content(page, url)
                 
                 # 获取HTML内容
-                html = await page.content()
-                
-                await browser.close()
-                return html
+                return await page.content()
         except Exception as e:
             print(f"Playwright错误: {str(e)}")
             self.playwright_deps_missing = "Chromium" in str(e)
             return None
     
+    def get_blocking_config(self) -> Dict:
+        """获取渲染时的资源拦截配置，站点配置优先于全局配置"""
+        playwright_config = CRAWLER_CONFIG.get("playwright", {})
+        return {
+            "block_resources": self.site_config.get("block_resources", playwright_config.get("block_resources", [])),
+            "block_domains": self.site_config.get("block_domains", playwright_config.get("block_domains", []))
+        }
+    
+    async def wait_for_content(self, page, url: str) -> bool:
+        """等待页面的内容选择器出现
+
+        首页等待文章列表选择器，文章页等待正文选择器，超时后直接使用当前DOM。
+        """
+        if url.rstrip("/") == self.site_config["url"].rstrip("/"):
+            selector = self.site_config.get("ready_selector", self.site_config.get("article_selector"))
+        else:
+            selector = self.site_config.get("content_selector")
+        readiness = PageReadiness(page)
+        ready = await readiness.wait_for_any_selector([selector])
+        self.readiness_timings[url] = readiness.timings
+        return ready
+    
     async def fetch_page(self, url: str) -> Optional[str]:
         """获取页面内容"""
         # 随机延迟
@@ -135,30 +159,31 @@ class BaseScraper:
         return await self.fetch_with_requests(url)
     
     def parse_article_list(self, html: str, is_top_news: bool = False) -> List[Dict]:
-        """解析文章列表"""
-        soup = BeautifulSoup(html, 'lxml')
+        """解析文章列表，同一份HTML的多次解析共享文档树"""
+        backend = self.document_backend
+        document = backend.parse(html)
         articles = []
         
         # 使用头条新闻选择器或普通文章选择器
         selector = self.site_config["top_news_selector"] if is_top_news else self.site_config["article_selector"]
-        article_elements = soup.select(selector)
+        article_elements = backend.select(document, selector)
         
         # 限制新闻数量
         article_elements = article_elements[:self.max_news]
         
         for article in article_elements:
             try:
-                title_elem = article.select_one(self.site_config["title_selector"])
-                link_elem = article.select_one(self.site_config["link_selector"])
-                summary_elem = article.select_one(self.site_config["summary_selector"])
-                time_elem = article.select_one(self.site_config["time_selector"])
+                title_elem = backend.select_one(article, self.site_config["title_selector"])
+                link_elem = backend.select_one(article, self.site_config["link_selector"])
+                summary_elem = backend.select_one(article, self.site_config["summary_selector"])
+                time_elem = backend.select_one(article, self.site_config["time_selector"])
                 
-                if title_elem and link_elem:
+                if title_elem is not None and link_elem is not None:
                     articles.append({
-                        "title": title_elem.get_text(strip=True),
-                        "url": link_elem.get("href", ""),
-                        "summary": summary_elem.get_text(strip=True) if summary_elem else "",
-                        "publish_time": time_elem.get_text(strip=True) if time_elem else "",
+                        "title": backend.text(title_elem),
+                        "url": backend.attr(link_elem, "href"),
+                        "summary": backend.text(summary_elem) if summary_elem is not None else "",
+                        "publish_time": backend.text(time_elem) if time_elem is not None else "",
                         "content": "",
                         "is_top_news": is_top_news
                     })
@@ -173,132 +198,143 @@ class BaseScraper:
         if not html:
             return ""
         
-        soup = BeautifulSoup(html, 'lxml')
-        content_elements = soup.select(self.site_config["content_selector"])
-        return "\n".join([p.get_text(strip=True) for p in content_elements])
+        backend = self.document_backend
+        document = backend.parse(html)
+        content_elements = backend.select(document, self.site_config["content_selector"])
+        content = "\n".join([backend.text(p) for p in content_elements])
+        release_document(html)
+        return content
     
-    def save_to_json(self, articles: List[Dict]):
-        """保存文章到JSON文件"""
-        # 确保 data 目录存在
-        data_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
-        print(f"保存目录: {data_dir}")
-        os.makedirs(data_dir, exist_ok=True)
+    def report_progress(self, event: str, **data):
+        """向进度回调报告爬取进度"""
+        if self.progress_callback:
+            try:
+                self.progress_callback(event, **data)
+            except Exception as e:
+                print(f"报告进度失败: {str(e)}")
+    
+    async def fetch_articles(self, articles: List[Dict], worker) -> None:
+        """通过共享调度器并发处理文章正文抓取
+
+        worker 为接收单篇文章的协程函数，负责就地更新文章字段。
+        最近已抓取过正文且未过期的文章直接复用已保存的正文，不调用 worker。
+        使用流式存储引擎时，每篇文章处理完成后立即在线程池中写入存储，文件写入和 fsync 不阻塞其他抓取。
+        """
+        storage = get_storage()
+        site = self.site_config['name']
+        
+        index = get_seen_index()
+        if index is not None:
+            pending = []
+            for article in articles:
+                if index.reuse(site, article):
+                    self.crawl_stats["reused"] += 1
+                    if storage.streaming:
+                        await self.append_article(storage, article)
+                else:
+                    pending.append(article)
+            if len(pending) < len(articles):
+                print(f"复用 {len(articles) - len(pending)} 篇已抓取的文章，需要抓取 {len(pending)} 篇")
+                self.report_progress("articles_reused", total=len(articles) - len(pending))
+            articles = pending
+        self.crawl_stats["fetched"] += len(articles)
         
-        # 生成文件名 - 使用 @ 符号，替换空格为下划线
-        site_name = self.site_config['name'].lower().replace(' ', '_')
-        filename = f"@{site_name}_{datetime.now().strftime('%Y%m%d')}.json"
-        filepath = os.path.join(data_dir, filename)
-        print(f"将保存到文件: {filepath}")
-        print(f"文章数量: {len(articles)}")
+        async def run_worker(article):
+            try:
+                result = await worker(article)
+                mark_fetched(article)
+                if storage.streaming:
+                    await self.append_article(storage, article)
+                return result
+            finally:
+                self.report_progress("article_done", url=article.get("url", ""))
         
+        self.report_progress("articles_found", total=len(articles))
+        scheduler = get_fetch_scheduler()
+        results = await scheduler.gather(articles, lambda article: article.get("url", ""), run_worker)
+        for article, result in zip(articles, results):
+            if isinstance(result, Exception):
+                print(f"获取文章内容失败: {str(result)} - {article.get('url', '')}")
+    
+    async def append_article(self, storage, article: Dict):
+        """在线程池中将单篇文章追加到流式存储，写入失败不影响抓取"""
+        loop = asyncio.get_running_loop()
         try:
-            # 保存文件
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(articles, f, ensure_ascii=False, indent=2)
-            print(f"成功保存到JSON文件: {filepath}")
-            
-            # 为了调试，打印文件是否存在和大小
-            if os.path.exists(filepath):
-                print(f"确认文件已创建: {filepath}")
-                print(f"文件大小: {os.path.getsize(filepath)} 字节")
-                print(f"文件权限: {oct(os.stat(filepath).st_mode)[-3:]}")
-                print(f"所有者: {os.stat(filepath).st_uid}")
-                print(f"用户组: {os.stat(filepath).st_gid}")
-            else:
-                print(f"警告：文件似乎未被创建: {filepath}")
-            
-            return filepath
+            await loop.run_in_executor(None, storage.append, self.site_config['name'], article)
+        except Exception as e:
+            print(f"写入文章失败: {str(e)} - {article.get('url', '')}")
+    
+    def save_to_json(self, articles: List[Dict]):
+        """保存文章，按配置写入JSON文件或SQLite数据库"""
+        storage = get_storage()
+        print(f"保存 {self.site_config['name']} 的文章到 {storage.name} 存储，文章数量: {len(articles)}")
+        
+        try:
+            date = datetime.now().strftime('%Y%m%d')
+            location = storage.save(self.site_config['name'], articles, date=date)
+            print(f"成功保存文章: {location}")
+            index = get_seen_index()
+            if index is not None:
+                index.record(self.site_config['name'], articles)
+            self.update_search_index(articles, date)
+            return location
         except Exception as e:
-            print(f"保存JSON文件时出错: {str(e)}")
+            print(f"保存文章时出错: {str(e)}")
             import traceback
             traceback.print_exc()
             return None
     
+    def update_search_index(self, articles: List[Dict], date: str):
+        """将刚保存的文章写入全文搜索索引，索引失败不影响保存结果
+
+        在事件循环中调用时在线程池中建立索引，FTS5事务不阻塞正在进行的抓取。
+        """
+        search_index = get_search_index()
+        if search_index is None:
+            return
+        # 保存后文章仍可能被修改，索引保存时的副本
+        snapshot = [dict(article) for article in articles]
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._index_articles(search_index, snapshot, date)
+            return
+        loop.run_in_executor(None, self._index_articles, search_index, snapshot, date)
+    
+    def _index_articles(self, search_index, articles: List[Dict], date: str):
+        try:
+            search_index.index(self.site_config['name'], articles, date)
+        except Exception as e:
+            print(f"更新搜索索引时出错: {str(e)}")
+
     def get_latest_json_file(self):
         """获取最新的JSON文件路径"""
-        # 使用 data 目录
-        data_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
-        if not os.path.exists(data_dir):
-            print(f"数据目录不存在: {data_dir}")
-            return None
-            
-        site_name = self.site_config['name'].lower().replace(' ', '_')
-        print(f"查找网站 {site_name} 的JSON文件")
-        json_files = [f for f in os.listdir(data_dir) if f.startswith(f"@{site_name}") and f.endswith('.json')]
-        
-        if not json_files:
-            print(f"未找到网站 {site_name} 的JSON文件")
+        path = self.reader.latest_file()
+        if not path:
+            print(f"未找到网站 {self.reader.file_name} 的JSON文件")
             return None
         
-        # 按文件修改时间排序，返回最新的
-        latest_file = max(json_files, key=lambda f: os.path.getmtime(os.path.join(data_dir, f)))
-        full_path = os.path.join(data_dir, latest_file)
-        print(f"找到最新的JSON文件: {full_path}")
-        return full_path
+        print(f"找到最新的JSON文件: {path}")
+        return path
     
     def get_json_file_by_date(self, date_str):
         """根据日期获取JSON文件路径"""
-        # 使用 data 目录
-        data_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
-        if not os.path.exists(data_dir):
-            print(f"数据目录不存在: {data_dir}")
+        path = self.reader.file_by_date(date_str)
+        if not path:
+            print(f"未找到网站 {self.reader.file_name} 在日期 {date_str} 的JSON文件")
             return None
-            
-        site_name = self.site_config['name'].lower().replace(' ', '_')
-        print(f"查找网站 {site_name} 在日期 {date_str} 的JSON文件")
-        
-        # 构建文件名模式
-        file_pattern = f"@{site_name}_{date_str}.json"
-        full_path = os.path.join(data_dir, file_pattern)
         
-        if os.path.exists(full_path):
-            print(f"找到日期 {date_str} 的JSON文件: {full_path}")
-            return full_path
-        else:
-            print(f"未找到日期 {date_str} 的JSON文件: {full_path}")
-            return None
+        print(f"找到日期 {date_str} 的JSON文件: {path}")
+        return path
     
     def get_available_dates(self):
-        """获取可用的新闻日期列表"""
-        # 使用 data 目录
-        data_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
-        if not os.path.exists(data_dir):
-            print(f"数据目录不存在: {data_dir}")
-            return []
-            
-        site_name = self.site_config['name'].lower().replace(' ', '_')
-        print(f"查找网站 {site_name} 的所有可用日期")
-        
-        # 查找所有匹配的JSON文件
-        json_files = [f for f in os.listdir(data_dir) if f.startswith(f"@{site_name}") and f.endswith('.json')]
-        
-        # 从文件名中提取日期
-        dates = []
-        for file in json_files:
-            # 文件名格式: @site_name_YYYYMMDD.json
-            try:
-                date_part = file.split('_')[-1].split('.')[0]
-                if len(date_part) == 8 and date_part.isdigit():
-                    dates.append(date_part)
-            except Exception as e:
-                print(f"从文件名 {file} 提取日期失败: {str(e)}")
-        
-        print(f"找到 {len(dates)} 个可用日期")
-        return dates
+        """获取可用的新闻日期列表（最新的在前）"""
+        return self.reader.dates()
     
     def get_articles_from_file(self, json_file):
         """从指定的JSON文件中获取文章"""
-        if not json_file or not os.path.exists(json_file):
-            return []
-        
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                articles = json.load(f)
-                # 添加来源信息
-                for article in articles:
-                    if not article.get('source'):
-                        article['source'] = self.site_config['name']
-                return articles
+            return self.reader.articles_from_file(json_file)
         except Exception as e:
             print(f"读取JSON文件失败: {str(e)}")
             return []
@@ -331,6 +367,7 @@ class BaseScraper:
             # 解析普通新闻
             regular_news = self.parse_article_list(html, is_top_news=False)
             print(f"解析到 {len(regular_news)} 条普通新闻")
+            release_document(html)
             
             # 合并新闻列表，优先使用头条新闻
             articles = top_news
@@ -367,11 +404,13 @@ class BaseScraper:
             print(f"共解析到 {len(articles)} 条新闻")
             
             # 获取文章内容
-            for article in articles:
+            async def fetch_content(article):
                 if not article.get("content"):
                     print(f"获取文章内容: {article['title']}")
                     article["content"] = await self.fetch_article_content(article["url"])
             
+            await self.fetch_articles(articles, fetch_content)
+            
             # 保存数据到JSON文件
             self.save_to_json(articles)
             
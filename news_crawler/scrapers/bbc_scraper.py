@@ -1,6 +1,7 @@
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 from .base_scraper import BaseScraper
+from ..utils.candidates import CandidateCollector
 from ..config.config import NEWS_SITES
 
 class BBCScraper(BaseScraper):
@@ -97,7 +98,8 @@ class BBCScraper(BaseScraper):
             print(f"页面标题: {page_title}")
             
             # 查找所有文章
-            articles = []
+            collector = CandidateCollector()
+            articles = collector.articles
             
             # 尝试多种选择器来找到文章元素
             selectors = [
@@ -215,17 +217,17 @@ class BBCScraper(BaseScraper):
                                         time = time_elem.get_text(strip=True)
                                         break
                                 
+                                article_data = {
+                                    "title": title,
+                                    "url": url,
+                                    "summary": summary,
+                                    "publish_time": time,
+                                    "content": summary,  # 先使用摘要作为内容
+                                    "is_top_news": False
+                                }
+
                                 # 检查是否已存在相同URL的文章
-                                if not any(a["url"] == url for a in articles):
-                                    article_data = {
-                                        "title": title,
-                                        "url": url,
-                                        "summary": summary,
-                                        "publish_time": time,
-                                        "content": summary,  # 先使用摘要作为内容
-                                        "is_top_news": False
-                                    }
-                                    articles.append(article_data)
+                                if collector.add(article_data):
                                     print(f"找到文章: {title}")
                                     
                                     # 如果已经达到最大数量，停止爬取
@@ -254,7 +256,7 @@ class BBCScraper(BaseScraper):
             current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             
             # 为每篇文章添加爬取时间和来源
-            for article in articles:
+            async def fetch_content(article):
                 article["crawl_time"] = current_time
                 article["source"] = self.site_config["name"]
                 
@@ -361,6 +363,8 @@ class BBCScraper(BaseScraper):
                         # 如果获取失败，使用摘要作为备选
                         article["content"] = article["summary"]
             
+            await self.fetch_articles(articles, fetch_content)
+            
             # 保存到JSON文件
             # 覆盖site_config中的name，确保生成正确的文件名
             original_name = self.site_config["name"]
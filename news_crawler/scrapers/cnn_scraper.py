@@ -1,6 +1,8 @@
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 from .base_scraper import BaseScraper
+from ..utils.candidates import CandidateCollector
+from ..utils.document_cache import release_document
 from ..config.config import NEWS_SITES
 
 class CNNScraper(BaseScraper):
@@ -116,7 +118,8 @@ class CNNScraper(BaseScraper):
             print(f"页面标题: {page_title}")
             
             # 查找所有文章
-            articles = []
+            collector = CandidateCollector()
+            articles = collector.articles
             article_elements = soup.select(self.site_config["article_selector"])
             print(f"找到 {len(article_elements)} 个文章元素")
             
@@ -193,8 +196,7 @@ class CNNScraper(BaseScraper):
                         }
                         
                         # 检查是否已存在相同URL的文章
-                        if not any(a["url"] == url for a in articles):
-                            articles.append(article_data)
+                        if collector.add(article_data):
                             print(f"添加文章: {title}")
                             
                             # 如果已经达到最大数量，停止爬取
@@ -216,12 +218,13 @@ class CNNScraper(BaseScraper):
             current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             
             # 为每篇文章获取内容
-            for article in articles:
+            async def fetch_content(article):
                 try:
                     print(f"获取文章内容: {article['url']}")
                     article_html = await self.fetch_page(article['url'])
                     if article_html:
-                        article_soup = BeautifulSoup(article_html, 'lxml')
+                        backend = self.document_backend
+                        article_document = backend.parse(article_html)
                         
                         # 提取文章内容
                         content_selectors = [
@@ -236,16 +239,16 @@ class CNNScraper(BaseScraper):
                         
                         content = []
                         for selector in content_selectors:
-                            paragraphs = article_soup.select(f"{selector} p")
+                            paragraphs = backend.select(article_document, f"{selector} p")
                             if paragraphs:
-                                content = [p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)]
+                                content = [text for text in (backend.text(p) for p in paragraphs) if text]
                                 if content:  # 确保找到了内容
                                     break
                         
                         if not content:
                             # 如果没有找到内容，尝试直接查找所有段落
-                            paragraphs = article_soup.select("article p, .article p, .content p")
-                            content = [p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)]
+                            paragraphs = backend.select(article_document, "article p, .article p, .content p")
+                            content = [text for text in (backend.text(p) for p in paragraphs) if text]
                         
                         if content:
                             article['content'] = "\n\n".join(content)
@@ -271,19 +274,16 @@ class CNNScraper(BaseScraper):
                         ]
                         
                         for selector in time_selectors:
-                            if selector.startswith('meta['):
-                                prop = selector[selector.find('property="')+10:selector.find('"]')]
-                                time_elem = article_soup.find('meta', property=prop)
-                            else:
-                                time_elem = article_soup.select_one(selector)
-                                
-                            if time_elem:
-                                if time_elem.name == 'meta':
-                                    article['publish_time'] = time_elem.get('content', '')
+                            time_elem = backend.select_one(article_document, selector)
+                            if time_elem is not None:
+                                if selector.startswith('meta['):
+                                    article['publish_time'] = backend.attr(time_elem, 'content')
                                 else:
-                                    article['publish_time'] = time_elem.get('datetime', '') or time_elem.get_text(strip=True)
+                                    article['publish_time'] = backend.attr(time_elem, 'datetime') or backend.text(time_elem)
                                 break
                         
+                        release_document(article_html)
+                        
                         # 随机延迟，避免请求过快
                         await self.random_delay()
                         
@@ -291,12 +291,14 @@ class CNNScraper(BaseScraper):
                     print(f"获取文章内容时出错: {str(e)}")
                     import traceback
                     print(f"错误详情:\n{traceback.format_exc()}")
-                    continue
+                    return
                     
                 # 添加爬取时间和来源
                 article["crawl_time"] = current_time
                 article["source"] = self.site_config["name"]
             
+            await self.fetch_articles(articles, fetch_content)
+            
             # 保存数据到 JSON 文件
             if articles:
                 print(f"保存 {len(articles)} 篇文章到 JSON 文件")
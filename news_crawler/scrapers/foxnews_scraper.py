@@ -3,6 +3,8 @@ Fox News专用爬虫类
 """
 from bs4 import BeautifulSoup
 from .base_scraper import BaseScraper, PLAYWRIGHT_AVAILABLE
+from ..utils.candidates import CandidateCollector
+from ..utils.document_cache import parse_document, release_document
 from ..config.config import NEWS_SITES
 import re
 from typing import List, Dict
@@ -88,7 +90,7 @@ class FoxNewsScraper(BaseScraper):
             print(f"已保存HTML内容到 {debug_file} 用于调试")
             
             # 直接使用更通用的方法解析文章
-            soup = BeautifulSoup(html, 'lxml')
+            soup = parse_document(html)
             
             # 打印页面标题，确认页面内容正确
             page_title = soup.title.text if soup.title else "无标题"
@@ -96,7 +98,8 @@ class FoxNewsScraper(BaseScraper):
             
             # 查找头条新闻区域
             print("查找头条新闻区域...")
-            top_news = []
+            top_collector = CandidateCollector()
+            top_news = top_collector.articles
             
             # 头条新闻选择器
             top_news_selectors = [
@@ -167,15 +170,15 @@ class FoxNewsScraper(BaseScraper):
                                     }
                                     
                                     # 检查是否已存在相同URL的文章
-                                    if not any(a["url"] == url for a in top_news):
-                                        top_news.append(article_data)
+                                    if top_collector.add(article_data):
                                         print(f"找到头条文章: {title}")
                             except Exception as e:
                                 print(f"解析头条文章时出错: {str(e)}")
             
             # 查找普通新闻
             print("查找普通新闻...")
-            regular_news = []
+            regular_collector = CandidateCollector(exclude=top_collector)
+            regular_news = regular_collector.articles
             
             # 普通新闻选择器
             regular_selectors = [
@@ -238,8 +241,7 @@ class FoxNewsScraper(BaseScraper):
                             }
                             
                             # 检查是否已存在相同URL的文章（包括头条新闻）
-                            if not any(a["url"] == url for a in top_news) and not any(a["url"] == url for a in regular_news):
-                                regular_news.append(article_data)
+                            if regular_collector.add(article_data):
                                 print(f"找到普通文章: {title}")
                     except Exception as e:
                         print(f"解析普通文章时出错: {str(e)}")
@@ -270,12 +272,15 @@ class FoxNewsScraper(BaseScraper):
                 print("未找到任何文章，请检查选择器是否正确")
                 return []
             
+            # 文章列表已解析完成，释放缓存的首页文档树
+            release_document(html)
+            
             # 获取文章内容
             print("开始获取文章内容...")
             from datetime import datetime
             current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             
-            for article in articles:
+            async def fetch_content(article):
                 try:
                     title = article.get("title", "")
                     url = article.get("url", "")
@@ -307,6 +312,8 @@ class FoxNewsScraper(BaseScraper):
                     if not article.get("content"):
                         article["content"] = "获取内容时出错，请访问原文阅读。"
             
+            await self.fetch_articles(articles, fetch_content)
+            
             # 保存数据
             self.save_to_json(articles)
             
@@ -349,7 +356,7 @@ class FoxNewsScraper(BaseScraper):
     
     def parse_article_list(self, html: str, is_top_news: bool = False) -> List[Dict]:
         """解析文章列表"""
-        soup = BeautifulSoup(html, 'lxml')
+        soup = parse_document(html)
         articles = []
         
         # 使用头条新闻选择器或普通文章选择器
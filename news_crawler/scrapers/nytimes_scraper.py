@@ -3,7 +3,11 @@
 """
 from bs4 import BeautifulSoup
 from .base_scraper import BaseScraper, PLAYWRIGHT_AVAILABLE
+from ..utils.candidates import CandidateCollector
+from ..utils.document_cache import parse_document, release_document
 from ..config.config import NEWS_SITES
+from ..utils.browser_pool import get_browser_pool
+from ..utils.page_readiness import PageReadiness
 import re
 import asyncio
 from datetime import datetime
@@ -23,8 +27,8 @@ class NYTimesScraper(BaseScraper):
             
             print(f"开始爬取 {self.site_config['name']}...")
             
-            # 获取页面内容，增加等待时间确保JavaScript完全加载
-            html = await self.fetch_page(self.site_config["url"], wait_time=10)
+            # 获取页面内容，等待文章列表渲染完成
+            html = await self.fetch_page(self.site_config["url"])
             if not html:
                 print(f"Failed to fetch content from {self.site_config['name']}")
                 return []
@@ -38,7 +42,7 @@ class NYTimesScraper(BaseScraper):
             print(f"已保存HTML内容到 {debug_file} 用于调试")
             
             # 使用BeautifulSoup解析HTML
-            soup = BeautifulSoup(html, 'lxml')
+            soup = parse_document(html)
             articles = []
             
             # 打印页面标题，确认页面内容正确
@@ -62,7 +66,8 @@ class NYTimesScraper(BaseScraper):
                     top_news_elements.extend(elements)
             
             # 从头条区域提取文章
-            top_news = []
+            top_collector = CandidateCollector()
+            top_news = top_collector.articles
             for element in top_news_elements:
                 article_elements = element.find_all(["article", "div", "section"], class_=lambda x: x and any(c in str(x) for c in ["story", "article", "css-"]))
                 for article_element in article_elements:
@@ -159,8 +164,7 @@ class NYTimesScraper(BaseScraper):
                             }
                             
                             # 检查是否已存在相同URL的文章
-                            if not any(a["url"] == url for a in top_news):
-                                top_news.append(article)
+                            if top_collector.add(article):
                                 print(f"找到头条文章: {title}")
                     except Exception as e:
                         print(f"解析头条文章时出错: {str(e)}")
@@ -180,7 +184,8 @@ class NYTimesScraper(BaseScraper):
                 "div.css-9mylee"
             ]
             
-            regular_news = []
+            regular_collector = CandidateCollector(exclude=top_collector)
+            regular_news = regular_collector.articles
             for selector in regular_selectors:
                 elements = soup.select(selector)
                 print(f"使用选择器 '{selector}' 找到 {len(elements)} 个元素")
@@ -285,8 +290,7 @@ class NYTimesScraper(BaseScraper):
                             }
                             
                             # 检查是否已存在相同URL的文章（包括头条新闻）
-                            if not any(a["url"] == url for a in top_news) and not any(a["url"] == url for a in regular_news):
-                                regular_news.append(article)
+                            if regular_collector.add(article):
                                 print(f"找到普通文章: {title}")
                     except Exception as e:
                         print(f"解析普通文章时出错: {str(e)}")
@@ -313,9 +317,12 @@ class NYTimesScraper(BaseScraper):
             
             print(f"共找到 {len(articles)} 篇文章")
             
+            # 文章列表已解析完成，释放缓存的首页文档树
+            release_document(html)
+            
             # 获取每篇文章的内容
             print("开始获取文章内容...")
-            for article in articles:
+            async def fetch_content(article):
                 try:
                     if not article.get("content"):
                         print(f"获取文章内容: {article['title']}")
@@ -328,6 +335,8 @@ class NYTimesScraper(BaseScraper):
                     print(f"获取文章内容失败: {str(e)}")
                     article["content"] = "获取内容时出错，请点击原文阅读。"
             
+            await self.fetch_articles(articles, fetch_content)
+            
             # 如果找到了文章，保存并返回
             if articles:
                 # 保存数据到JSON文件
@@ -397,42 +406,41 @@ class NYTimesScraper(BaseScraper):
         
         return False
     
-    async def fetch_page(self, url: str, wait_time: int = 5) -> str:
-        """重写fetch_page方法，增加更多的等待时间和页面交互"""
+    async def fetch_page(self, url: str) -> str:
+        """重写fetch_page方法，按内容选择器和DOM静默判断页面就绪，首页按需滚动加载更多文章"""
         if not PLAYWRIGHT_AVAILABLE:
             return await self.fetch_page_with_requests(url)
             
         try:
-            from playwright.async_api import async_playwright
-            
-            playwright = await async_playwright().start()
-            browser = await playwright.chromium.launch()
-            page = await browser.new_page()
-            
-            # 设置更真实的User-Agent
-            await page.set_extra_http_headers({
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
-                "Accept-Language": "en-US,en;q=0.9",
-            })
-            
-            # 访问页面
-            await page.goto(url, wait_until="networkidle", timeout=30000)
-            
-            # 等待主要内容加载
-            await asyncio.sleep(wait_time)
-            
-            # 模拟滚动以触发懒加载
-            for _ in range(3):
-                await page.evaluate("window.scrollBy(0, window.innerHeight)")
-                await asyncio.sleep(1)
-            
-            # 获取页面内容
-            content = await page.content()
-            
-            await browser.close()
-            await playwright.stop()
-            
-            return content
+            async with get_browser_pool().page(**self.get_blocking_config()) as page:
+                # 设置更真实的User-Agent
+                await page.set_extra_http_headers({
+                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
+                    "Accept-Language": "en-US,en;q=0.9",
+                })
+                
+                # 访问页面
+                await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+                
+                # 等待主要内容出现并停止变化
+                readiness = PageReadiness(page)
+                is_homepage = url.rstrip("/") == self.site_config["url"].rstrip("/")
+                if is_homepage:
+                    selectors = [self.site_config["article_selector"], self.site_config["top_news_selector"]]
+                else:
+                    selectors = [self.site_config["content_selector"]]
+                await readiness.wait_for_any_selector(selectors)
+                await readiness.wait_for_dom_quiet()
+                
+                # 首页只滚动到文章数量足够为止，以触发懒加载
+                if is_homepage:
+                    await readiness.scroll_until_count(self.site_config["article_selector"], self.max_news)
+                
+                self.readiness_timings[url] = readiness.timings
+                print(f"页面就绪耗时 {url}: {readiness.timings}")
+                
+                # 获取页面内容
+                return await page.content()
                 
         except Exception as e:
             print(f"使用Playwright获取页面失败: {str(e)}，尝试使用requests备选方案")
@@ -440,8 +448,8 @@ class NYTimesScraper(BaseScraper):
     
     async def fetch_page_with_requests(self, url: str) -> str:
         """使用requests库作为备选方案获取页面内容"""
-        import aiohttp
         import random
+        from ..utils.http_client import get_http_client
         
         headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
@@ -457,20 +465,19 @@ class NYTimesScraper(BaseScraper):
         await asyncio.sleep(random.uniform(1, 3))
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers, timeout=30) as response:
-                    if response.status == 200:
-                        return await response.text()
-                    else:
-                        print(f"请求失败，状态码: {response.status}")
-                        return ""
+            response = await get_http_client().get(url, headers=headers, timeout=30)
+            if response.status == 200:
+                return response.text
+            else:
+                print(f"请求失败，状态码: {response.status}")
+                return ""
         except Exception as e:
             print(f"使用requests获取页面失败: {str(e)}")
             return ""
     
     def parse_article_list(self, html: str, is_top_news: bool = False):
         """重写文章列表解析方法，处理NYTimes特有的HTML结构"""
-        soup = BeautifulSoup(html, 'lxml')
+        soup = parse_document(html)
         articles = []
         
         # 使用头条新闻选择器或普通文章选择器
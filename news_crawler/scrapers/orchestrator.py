@@ -0,0 +1,90 @@
+"""
+多站点爬取编排器，并发运行各站点爬虫，单站点超时或失败不影响其他站点
+"""
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, Optional
+from ..config.config import CRAWLER_CONFIG, NEWS_SITES
+from .registry import get_scraper
+from ..utils.http_cache import CacheStats
+
+logger = logging.getLogger(__name__)
+
+# 每个事件循环中各站点的爬取锁，同一站点的爬虫实例同一时间只运行一个爬取任务
+_site_locks: Dict[asyncio.AbstractEventLoop, Dict[str, asyncio.Lock]] = {}
+
+
+def get_site_lock(site_id: str) -> asyncio.Lock:
+    loop = asyncio.get_running_loop()
+    for closed_loop in [l for l in _site_locks if l.is_closed()]:
+        del _site_locks[closed_loop]
+    locks = _site_locks.setdefault(loop, {})
+    if site_id not in locks:
+        locks[site_id] = asyncio.Lock()
+    return locks[site_id]
+
+
+def get_site_timeout(site_id: str) -> float:
+    """获取站点的爬取超时时间（秒），站点配置优先于全局配置"""
+    site_config = NEWS_SITES.get(site_id, {})
+    return site_config.get("crawl_timeout", CRAWLER_CONFIG.get("site_timeout", 300))
+
+
+async def run_site(site_id: str, scraper_class, progress: Optional[Callable] = None) -> Dict:
+    """运行单个站点的爬虫并记录耗时和结果
+
+    爬虫实例在进程内复用，同一站点的爬取任务依次运行。
+    progress 为可选的进度回调，签名为 progress(site_id, event, **data)。
+    """
+    timeout = get_site_timeout(site_id)
+    started_at = time.monotonic()
+    result = {"site": site_id, "status": "success", "count": 0, "elapsed": 0.0}
+
+    try:
+        logger.info(f"爬取网站: {site_id}")
+        scraper = get_scraper(site_id, scraper_class)
+        async with get_site_lock(site_id):
+            scraper.progress_callback = None
+            scraper.readiness_timings = {}
+            scraper.cache_stats = CacheStats()
+            scraper.crawl_stats = {"reused": 0, "fetched": 0}
+            if progress:
+                scraper.progress_callback = lambda event, **data: progress(site_id, event, **data)
+                progress(site_id, "started")
+            articles = await asyncio.wait_for(scraper.scrape(), timeout=timeout)
+        result["count"] = len(articles)
+        result["http_cache"] = scraper.cache_stats.to_dict()
+        result["articles"] = dict(scraper.crawl_stats)
+        logger.info(f"成功爬取 {site_id}: {len(articles)} 条新闻，正文复用/抓取: "
+                    f"{result['articles']['reused']}/{result['articles']['fetched']}，HTTP缓存: {result['http_cache']}")
+    except asyncio.TimeoutError:
+        result["status"] = "timeout"
+        result["message"] = f"爬取超时（{timeout} 秒）"
+        logger.error(f"爬取 {site_id} 超时: {timeout} 秒")
+    except Exception as e:
+        result["status"] = "error"
+        result["message"] = str(e)
+        logger.error(f"爬取 {site_id} 失败: {str(e)}")
+
+    result["elapsed"] = round(time.monotonic() - started_at, 2)
+    if progress:
+        progress(site_id, "finished", **result)
+    return result
+
+
+async def run_sites(scrapers: Dict[str, type], progress: Optional[Callable] = None) -> Dict:
+    """并发运行多个站点的爬虫
+
+    scrapers 为站点ID到爬虫类的映射，返回总数、总耗时和各站点结果。
+    """
+    started_at = time.monotonic()
+    results = await asyncio.gather(*(
+        run_site(site_id, scraper_class, progress) for site_id, scraper_class in scrapers.items()
+    ))
+
+    return {
+        "count": sum(result["count"] for result in results),
+        "elapsed": round(time.monotonic() - started_at, 2),
+        "sites": {result["site"]: result for result in results}
+    }
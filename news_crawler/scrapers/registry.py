@@ -0,0 +1,72 @@
+"""
+爬虫注册表，按站点ID延迟导入爬虫类，并维护进程级的爬虫实例
+
+爬虫模块会导入 bs4、aiohttp、feedparser 等较重的依赖，只在真正需要爬虫类时才导入，
+Web应用启动和只读请求不需要加载这些模块。
+"""
+import importlib
+import threading
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, Tuple
+
+# 站点ID -> (模块名, 类名)
+SCRAPER_CLASSES: Dict[str, Tuple[str, str]] = {
+    "foxnews": ("news_crawler.scrapers.foxnews_scraper", "FoxNewsScraper"),
+    "nytimes": ("news_crawler.scrapers.nytimes_scraper", "NYTimesScraper"),
+    "washingtonpost": ("news_crawler.scrapers.washingtonpost_scraper", "WashingtonPostScraper"),
+    "cnn": ("news_crawler.scrapers.cnn_scraper", "CNNScraper"),
+    "bbc": ("news_crawler.scrapers.bbc_scraper", "BBCScraper"),
+    "wsj": ("news_crawler.scrapers.wsj_scraper", "WSJScraper")
+}
+
+
+def load_scraper_class(module_name: str, class_name: str) -> type:
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+class ScraperRegistry(Mapping):
+    """站点ID到爬虫类的只读映射，首次访问某个站点时才导入对应模块
+
+    keys()、in 和 len() 不会导入任何爬虫模块。
+    """
+
+    def __init__(self, classes: Dict[str, Tuple[str, str]] = None):
+        self._classes = dict(SCRAPER_CLASSES if classes is None else classes)
+        self._loaded: Dict[str, type] = {}
+
+    def __getitem__(self, site_id: str) -> type:
+        scraper_class = self._loaded.get(site_id)
+        if scraper_class is None:
+            scraper_class = self._loaded[site_id] = load_scraper_class(*self._classes[site_id])
+        return scraper_class
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._classes)
+
+    def __len__(self) -> int:
+        return len(self._classes)
+
+    def __contains__(self, site_id) -> bool:
+        return site_id in self._classes
+
+    def select(self, site_ids: Iterable[str]) -> "ScraperRegistry":
+        """返回只包含指定站点的注册表，同样延迟导入"""
+        return ScraperRegistry({site_id: self._classes[site_id] for site_id in site_ids})
+
+
+SCRAPERS = ScraperRegistry()
+
+
+_instances: Dict[str, object] = {}
+_instances_lock = threading.Lock()
+
+
+def get_scraper(site_id: str, scraper_class: type = None):
+    """获取站点的进程级爬虫实例，首次调用时创建，之后的爬取任务复用同一个实例"""
+    scraper = _instances.get(site_id)
+    if scraper is None:
+        with _instances_lock:
+            scraper = _instances.get(site_id)
+            if scraper is None:
+                scraper = _instances[site_id] = (scraper_class or SCRAPERS[site_id])()
+    return scraper
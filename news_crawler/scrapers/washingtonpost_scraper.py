@@ -3,6 +3,8 @@
 """
 from bs4 import BeautifulSoup
 from .base_scraper import BaseScraper, PLAYWRIGHT_AVAILABLE
+from ..utils.candidates import CandidateCollector
+from ..utils.document_cache import parse_document, release_document
 from ..config.config import NEWS_SITES
 import re
 
@@ -36,7 +38,7 @@ class WashingtonPostScraper(BaseScraper):
             print(f"已保存HTML内容到 {debug_file} 用于调试")
             
             # 直接使用更通用的方法解析文章
-            soup = BeautifulSoup(html, 'lxml')
+            soup = parse_document(html)
             
             # 打印页面标题，确认页面内容正确
             page_title = soup.title.text if soup.title else "无标题"
@@ -44,7 +46,8 @@ class WashingtonPostScraper(BaseScraper):
             
             # 查找头条新闻区域
             print("查找头条新闻区域...")
-            top_news = []
+            top_collector = CandidateCollector()
+            top_news = top_collector.articles
             
             # 头条新闻选择器
             top_news_selectors = [
@@ -182,8 +185,7 @@ class WashingtonPostScraper(BaseScraper):
                                     }
                                     
                                     # 检查是否已存在相同URL的文章
-                                    if not any(a["url"] == url for a in top_news):
-                                        top_news.append(article_data)
+                                    if top_collector.add(article_data):
                                         print(f"找到头条文章: {title}")
                             except Exception as e:
                                 print(f"解析头条文章时出错: {str(e)}")
@@ -192,7 +194,8 @@ class WashingtonPostScraper(BaseScraper):
             
             # 查找普通新闻
             print("查找普通新闻...")
-            regular_news = []
+            regular_collector = CandidateCollector(exclude=top_collector)
+            regular_news = regular_collector.articles
             
             # 普通新闻选择器
             regular_selectors = [
@@ -321,8 +324,7 @@ class WashingtonPostScraper(BaseScraper):
                             }
                             
                             # 检查是否已存在相同URL的文章（包括头条新闻）
-                            if not any(a["url"] == url for a in top_news) and not any(a["url"] == url for a in regular_news):
-                                regular_news.append(article_data)
+                            if regular_collector.add(article_data):
                                 print(f"找到普通文章: {title}")
                     except Exception as e:
                         print(f"解析普通文章时出错: {str(e)}")
@@ -355,9 +357,12 @@ class WashingtonPostScraper(BaseScraper):
                 print("未找到任何文章，请检查选择器是否正确")
                 return []
             
+            # 文章列表已解析完成，释放缓存的首页文档树
+            release_document(html)
+            
             # 获取文章内容
             print("开始获取文章内容...")
-            for article in articles:
+            async def fetch_content(article):
                 title = article.get("title", "")
                 url = article.get("url", "")
                 print(f"获取文章内容: {title}")
@@ -368,6 +373,8 @@ class WashingtonPostScraper(BaseScraper):
                 if content:
                     article["content"] = content
             
+            await self.fetch_articles(articles, fetch_content)
+            
             # 保存数据
             self.save_to_json(articles)
             
@@ -409,7 +416,7 @@ class WashingtonPostScraper(BaseScraper):
     
     def parse_article_list(self, html: str, is_top_news: bool = False):
         """重写文章列表解析方法，处理Washington Post特有的HTML结构"""
-        soup = BeautifulSoup(html, 'lxml')
+        soup = parse_document(html)
         articles = []
         
         # 使用头条新闻选择器或普通文章选择器
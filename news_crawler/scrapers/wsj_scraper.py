@@ -2,15 +2,15 @@
 华尔街日报爬虫
 """
 import logging
-import asyncio
 import json
 import re
-import aiohttp
-import feedparser
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 from datetime import datetime, timedelta
 from news_crawler.scrapers.base_scraper import BaseScraper
+from news_crawler.utils.http_client import get_http_client
+from news_crawler.utils.document_cache import parse_document, release_document
+from news_crawler.utils.feed_ingest import FeedIngestor, entry_guid
+from news_crawler.utils.seen_index import has_reusable_content
 from news_crawler.config.config import NEWS_SITES, CRAWLER_CONFIG
 import pytz
 from email.utils import parsedate_to_datetime
@@ -34,16 +34,25 @@ class WSJScraper(BaseScraper):
             "https://feeds.content.dowjones.io/public/rss/RSSOpinion",  # 观点
             # 可以添加更多 RSS 源
         ]
+        self.feed_ingestor = FeedIngestor("wsj", self.rss_feeds)
+        self.rss_guids = {}  # 本次爬取中文章URL到RSS条目GUID的映射
     
     async def scrape(self):
-        """重写爬虫方法，从 RSS 源获取最新文章"""
+        """重写爬虫方法，从 RSS 源获取最新文章
+
+        只有之前没有见过的RSS条目参与排序和正文抓取，新文章与当天已保存的文章合并后保存。
+        """
         articles = []
         
-        # 从所有 RSS 源获取文章
+        # 从所有 RSS 源获取新文章
         rss_articles = await self.scrape_from_rss()
         if rss_articles:
             articles.extend(rss_articles)
-            logger.info(f"从 RSS 源获取到 {len(rss_articles)} 篇文章")
+            logger.info(f"从 RSS 源获取到 {len(rss_articles)} 篇新文章")
+        else:
+            logger.info("RSS源没有新文章")
+            self.feed_ingestor.commit()
+            return []
         
         # 根据发布时间和重要性对文章进行排序
         sorted_articles = self.sort_articles_by_time_and_importance(articles)
@@ -57,16 +66,25 @@ class WSJScraper(BaseScraper):
                 unique_articles.append(article)
         
         # 获取文章内容
-        tasks = []
-        for article in unique_articles:
-            if article.get("url") and not article.get("content"):
-                tasks.append(self.fetch_article_content(article))
+        pending = [
+            article for article in unique_articles
+            if article.get("url") and not article.get("content")
+        ]
+        
+        if pending:
+            await self.fetch_articles(pending, self.fetch_article_content)
         
-        if tasks:
-            await asyncio.gather(*tasks)
+        # 与当天已保存的文章合并，新文章在前
+        today = datetime.now().strftime('%Y%m%d')
+        saved = [article for article in self.reader.articles(today) if article.get("url") not in urls]
         
         # 保存文章到JSON文件
-        self.save_to_json(unique_articles)
+        self.save_to_json(unique_articles + saved)
+        # 超出数量限制而没有保存的文章、正文抓取失败的文章下次爬取时仍作为新文章
+        fetched = {article["url"] for article in unique_articles if has_reusable_content(article)}
+        self.feed_ingestor.commit(exclude=[
+            self.rss_guids[url] for url in self.rss_guids if url not in fetched
+        ])
         
         return unique_articles
     
@@ -146,91 +164,64 @@ class WSJScraper(BaseScraper):
             return articles
     
     async def scrape_from_rss(self):
-        """从RSS源获取文章的改进版本"""
+        """并发获取所有RSS源，只返回之前没有见过的文章"""
         articles = []
-        timeout = aiohttp.ClientTimeout(total=30)
+        self.rss_guids = {}
+        entries = await self.feed_ingestor.fetch_new(self.cache_stats)
+        logger.info(f"RSS源统计: {self.feed_ingestor.stats}")
         
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            for feed_url in self.rss_feeds:
-                try:
-                    logger.info(f"从RSS源获取文章: {feed_url}")
-                    headers = {
-                        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
-                        "Accept": "application/rss+xml,application/xml;q=0.9,*/*;q=0.8",
-                    }
-                    
-                    async with session.get(feed_url, headers=headers) as response:
-                        if response.status == 200:
-                            feed_content = await response.text()
-                            
-                            # 验证RSS内容
-                            if not feed_content or len(feed_content) < 100:
-                                logger.warning(f"RSS源返回内容过短: {feed_url}")
-                                continue
-                                
-                            if not ('<rss' in feed_content or '<feed' in feed_content):
-                                logger.warning(f"返回内容不是有效的RSS格式: {feed_url}")
-                                continue
-                            
-                            feed = feedparser.parse(feed_content)
-                            
-                            if not feed.entries:
-                                logger.warning(f"RSS源没有任何条目: {feed_url}")
-                                continue
-                            
-                            for entry in feed.entries:
-                                try:
-                                    # 验证必要字段
-                                    if not hasattr(entry, 'title') or not hasattr(entry, 'link'):
-                                        continue
-                                    
-                                    url = entry.link
-                                    if not self.is_valid_article_url(url):
-                                        continue
-                                    
-                                    title = entry.title.strip()
-                                    if not title:
-                                        continue
-                                    
-                                    summary = ""
-                                    if hasattr(entry, 'summary'):
-                                        summary = entry.summary
-                                    elif hasattr(entry, 'description'):
-                                        summary = entry.description
-                                    
-                                    # 处理发布时间
-                                    publish_time = ""
-                                    for time_field in ['published', 'pubDate', 'updated', 'created']:
-                                        if hasattr(entry, time_field):
-                                            publish_time = getattr(entry, time_field)
-                                            break
-                                    
-                                    article = {
-                                        "title": title,
-                                        "url": url,
-                                        "summary": summary,
-                                        "publish_time": publish_time,
-                                        "source": self.site_name,
-                                        "site": "wsj",
-                                        "is_top_news": False,
-                                        "importance": 5,
-                                        "crawl_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                                        "content": ""
-                                    }
-                                    
-                                    articles.append(article)
-                                    logger.info(f"从RSS源提取文章: {title[:50]}...")
-                                except Exception as e:
-                                    logger.error(f"处理RSS条目时出错: {str(e)}")
-                        else:
-                            logger.warning(f"获取RSS源失败，状态码: {response.status}, URL: {feed_url}")
-                except asyncio.TimeoutError:
-                    logger.error(f"获取RSS源超时: {feed_url}")
-                except Exception as e:
-                    logger.error(f"获取RSS源出错: {feed_url}, 错误: {str(e)}")
+        for feed_url, entry in entries:
+            try:
+                article = self.entry_to_article(entry)
+                if article:
+                    self.rss_guids.setdefault(article["url"], entry_guid(entry))
+                    articles.append(article)
+                    logger.info(f"从RSS源提取文章: {article['title'][:50]}...")
+            except Exception as e:
+                logger.error(f"处理RSS条目时出错: {str(e)}")
         
         return articles
     
+    def entry_to_article(self, entry):
+        """将RSS条目转换为文章，条目无效时返回 None"""
+        # 验证必要字段
+        if not hasattr(entry, 'title') or not hasattr(entry, 'link'):
+            return None
+        
+        url = entry.link
+        if not self.is_valid_article_url(url):
+            return None
+        
+        title = entry.title.strip()
+        if not title:
+            return None
+        
+        summary = ""
+        if hasattr(entry, 'summary'):
+            summary = entry.summary
+        elif hasattr(entry, 'description'):
+            summary = entry.description
+        
+        # 处理发布时间
+        publish_time = ""
+        for time_field in ['published', 'pubDate', 'updated', 'created']:
+            if hasattr(entry, time_field):
+                publish_time = getattr(entry, time_field)
+                break
+        
+        return {
+            "title": title,
+            "url": url,
+            "summary": summary,
+            "publish_time": publish_time,
+            "source": self.site_name,
+            "site": "wsj",
+            "is_top_news": False,
+            "importance": 5,
+            "crawl_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "content": ""
+        }
+    
     async def fetch_article_content(self, article):
         """获取文章内容，不使用随机延迟"""
         try:
@@ -238,7 +229,8 @@ class WSJScraper(BaseScraper):
             if not html:
                 return
             
-            soup = BeautifulSoup(html, "html.parser")
+            backend = self.document_backend
+            document = backend.parse(html)
             
             # 提取文章内容
             content_selectors = [
@@ -253,12 +245,13 @@ class WSJScraper(BaseScraper):
             
             content = ""
             for selector in content_selectors:
-                content_elements = soup.select(selector)
+                content_elements = backend.select(document, selector)
                 if content_elements:
                     logger.info(f"使用选择器 {selector} 找到 {len(content_elements)} 段内容")
-                    content = "\n".join([p.get_text().strip() for p in content_elements])
+                    content = "\n".join([backend.text(p, strip=False).strip() for p in content_elements])
                     break
             
+            release_document(html)
             article["content"] = content
             
         except Exception as e:
@@ -268,27 +261,27 @@ class WSJScraper(BaseScraper):
     async def fetch_page(self, url):
         """获取页面内容，不使用随机延迟"""
         try:
-            timeout = aiohttp.ClientTimeout(total=30)
+            timeout = 30
             headers = {
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
                 "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
             }
             
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        return await response.text()
-                    else:
-                        logger.warning(f"获取页面失败，状态码: {response.status}, URL: {url}")
-                        return ""
-                        
+            response = await get_http_client().get_cached(url, headers=headers, timeout=timeout,
+                                                          stats=self.cache_stats)
+            if response.status == 200:
+                return response.text
+            else:
+                logger.warning(f"获取页面失败，状态码: {response.status}, URL: {url}")
+                return ""
+                
         except Exception as e:
             logger.error(f"获取页面内容时出错: {str(e)}")
             return ""
     
     def parse_article_list(self, html, is_top_news=False):
-        """解析文章列表，重写BaseScraper的方法"""
-        soup = BeautifulSoup(html, 'html.parser')
+        """解析文章列表，重写BaseScraper的方法，与extract_json_data共享同一棵文档树"""
+        soup = parse_document(html)
         articles = []
         
         # 打印页面标题，确认页面内容正确
@@ -392,6 +385,8 @@ class WSJScraper(BaseScraper):
                     else:
                         logger.warning(f"无法从元素提取文章信息，类名: {element.get('class', [])}")
         
+        release_document(html)
+        
         # 去重
         unique_articles = []
         urls = set()
@@ -407,7 +402,7 @@ class WSJScraper(BaseScraper):
         """从页面中提取嵌入的JSON数据"""
         try:
             # 查找包含文章数据的script标签
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = parse_document(html)
             json_scripts = soup.find_all('script', type='application/json')
             
             for script in json_scripts:
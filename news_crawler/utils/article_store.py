@@ -0,0 +1,59 @@
+"""
+已保存文章的读取缓存，按文件的修改时间和大小判断缓存是否失效
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+from ..config.config import CRAWLER_CONFIG
+
+
+class ArticleStore:
+    """文章文件读取缓存
+
+    解码后的文章列表按文件路径缓存，只有文件的 mtime 或大小变化时才重新读取。
+    最多缓存 max_files 个文件，超出时淘汰最久未使用的文件。
+    每次读取返回文章字典的副本，调用方修改返回的文章（补全来源、合并、计算签名等）不会影响缓存。
+    """
+
+    def __init__(self, max_files: int = None):
+        self.max_files = max_files or CRAWLER_CONFIG.get("article_cache_files", 32)
+        self._files: "OrderedDict[str, Tuple[int, int, List[Dict]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, path: str) -> List[Dict]:
+        """读取JSON文件中的文章列表，文件未变化时使用缓存，返回文章的副本"""
+        stat = os.stat(path)
+        with self._lock:
+            entry = self._files.get(path)
+            if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                self._files.move_to_end(path)
+                return [dict(article) for article in entry[2]]
+
+        with open(path, 'r', encoding='utf-8') as f:
+            articles = json.load(f)
+
+        with self._lock:
+            self._files[path] = (stat.st_mtime_ns, stat.st_size, articles)
+            self._files.move_to_end(path)
+            while len(self._files) > self.max_files:
+                self._files.popitem(last=False)
+        return [dict(article) for article in articles]
+
+    def invalidate(self, path: str):
+        """使文件的缓存失效，写入文件后调用"""
+        with self._lock:
+            self._files.pop(path, None)
+
+    def clear(self):
+        with self._lock:
+            self._files.clear()
+
+
+article_store = ArticleStore()
+
+
+def get_article_store() -> ArticleStore:
+    """获取进程级文章读取缓存"""
+    return article_store
@@ -0,0 +1,156 @@
+"""
+Playwright浏览器池，进程内复用同一个Chromium实例及其上下文和页面
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+from ..config.config import CRAWLER_CONFIG
+
+
+def build_route_handler(resource_types: Iterable[str], domains: Iterable[str]):
+    """构建请求拦截处理器，按资源类型和域名黑名单中止请求"""
+    blocked_types = set(resource_types or [])
+    blocked_domains = tuple(domain.lower().lstrip(".") for domain in (domains or []))
+
+    def is_blocked_host(host: str) -> bool:
+        return any(host == domain or host.endswith("." + domain) for domain in blocked_domains)
+
+    async def handle_route(route):
+        request = route.request
+        if request.resource_type in blocked_types or is_blocked_host(urlparse(request.url).hostname or ""):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    return handle_route
+
+
+class PooledPage:
+    """池中的页面，每个页面独占一个浏览器上下文"""
+
+    def __init__(self, context, page):
+        self.context = context
+        self.page = page
+        self.navigations = 0
+
+    async def close(self):
+        try:
+            await self.context.close()
+        except Exception as e:
+            print(f"关闭浏览器上下文失败: {str(e)}")
+
+
+class BrowserPool:
+    """浏览器池
+
+    首次使用时启动浏览器，之后所有渲染请求共享该浏览器。
+    同时打开的页面数受 max_pages 限制，页面导航次数达到 max_navigations 后
+    连同上下文一起关闭并重建，避免长期运行导致的内存增长。
+    """
+
+    def __init__(self, config: Dict = None):
+        self.playwright_config = CRAWLER_CONFIG.get("playwright", {})
+        pool_config = config or self.playwright_config.get("pool", {})
+        self.max_pages = pool_config.get("max_pages", 4)
+        self.max_navigations = pool_config.get("max_navigations", 50)
+        self.headless = pool_config.get("headless", True)
+        self._playwright = None
+        self._browser = None
+        self._idle: List[PooledPage] = []
+        self._launch_lock = asyncio.Lock()
+        self._page_semaphore = asyncio.Semaphore(self.max_pages)
+
+    async def _ensure_browser(self):
+        """启动浏览器，浏览器断开后会重新启动"""
+        async with self._launch_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return
+            await self._close_browser()
+            from playwright.async_api import async_playwright
+            self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(headless=self.headless)
+
+    async def _new_page(self) -> PooledPage:
+        context = await self._browser.new_context(
+            user_agent=CRAWLER_CONFIG["headers"]["User-Agent"],
+            viewport=self.playwright_config.get("viewport", {"width": 1920, "height": 1080}),
+            device_scale_factor=self.playwright_config.get("device_scale_factor", 1),
+            ignore_https_errors=self.playwright_config.get("ignore_https_errors", True)
+        )
+        page = await context.new_page()
+        return PooledPage(context, page)
+
+    async def _release(self, pooled: PooledPage, healthy: bool):
+        """归还页面，不健康或达到导航上限的页面直接回收"""
+        if healthy and not pooled.page.is_closed() and pooled.navigations < self.max_navigations:
+            try:
+                # 清理调用方设置的页面级状态
+                await pooled.page.unroute("**/*")
+                await pooled.page.set_extra_http_headers({})
+                self._idle.append(pooled)
+                return
+            except Exception as e:
+                print(f"重置浏览器页面失败: {str(e)}")
+        await pooled.close()
+
+    @asynccontextmanager
+    async def page(self, block_resources: Iterable[str] = None, block_domains: Iterable[str] = None):
+        """借出一个页面，使用完毕后自动归还
+
+        block_resources 为要拦截的资源类型（如 image、font、media），
+        block_domains 为要拦截的域名黑名单，二者仅对本次借出有效。
+        用法: async with pool.page() as page: ...
+        """
+        async with self._page_semaphore:
+            await self._ensure_browser()
+            pooled = self._idle.pop() if self._idle else await self._new_page()
+            healthy = False
+            try:
+                if block_resources or block_domains:
+                    await pooled.page.route("**/*", build_route_handler(block_resources, block_domains))
+                yield pooled.page
+                healthy = True
+            finally:
+                pooled.navigations += 1
+                await self._release(pooled, healthy)
+
+    async def _close_browser(self):
+        for pooled in self._idle:
+            await pooled.close()
+        self._idle.clear()
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception as e:
+                print(f"关闭浏览器失败: {str(e)}")
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def close(self):
+        """关闭浏览器和所有页面"""
+        async with self._launch_lock:
+            await self._close_browser()
+
+
+# Playwright对象与事件循环绑定，因此每个事件循环一个浏览器池
+_pools: Dict[asyncio.AbstractEventLoop, BrowserPool] = {}
+
+
+def get_browser_pool() -> BrowserPool:
+    """获取当前事件循环共享的浏览器池"""
+    loop = asyncio.get_running_loop()
+    for closed_loop in [l for l in _pools if l.is_closed()]:
+        del _pools[closed_loop]
+    if loop not in _pools:
+        _pools[loop] = BrowserPool()
+    return _pools[loop]
+
+
+async def close_browser_pool():
+    """关闭当前事件循环的浏览器池，应在事件循环结束前调用"""
+    pool: Optional[BrowserPool] = _pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.close()
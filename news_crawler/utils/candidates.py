@@ -0,0 +1,71 @@
+"""
+候选文章收集，按规范化后的URL去重并保持首次出现的顺序
+
+规范化后的URL只用作去重的键，文章保存的仍是页面上的原始URL。
+"""
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# 不影响页面内容的跟踪参数
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "smid", "smtyp", "cmpid",
+    "ref", "referrer", "src", "s_cid", "ftag", "iid", "itid", "partner", "xtor", "at_medium",
+    "at_campaign", "at_link", "at_ptr_name", "at_format", "at_link_origin", "at_bbc_team"
+}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name.startswith("utm_") or name in TRACKING_PARAMS
+
+
+def canonicalize_url(url: str, keep_query: bool = False) -> str:
+    """规范化文章URL，用作去重的键
+
+    协议和主机名转为小写，去掉默认端口和片段，路径保持不变（部分站点的文章URL以斜杠结尾）；
+    默认去掉整个查询字符串，keep_query 为 True 时只去掉跟踪参数。
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if parts.port and DEFAULT_PORTS.get(scheme) == parts.port:
+        netloc = netloc.rsplit(":", 1)[0]
+    path = parts.path or "/"
+
+    query = ""
+    if keep_query:
+        query = urlencode([(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+                           if not is_tracking_param(name)])
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+class CandidateCollector:
+    """候选文章收集器
+
+    add() 以规范化后的URL为键用哈希集合判断是否已收集，重复的文章被忽略，
+    articles 按首次出现的顺序保存收集到的文章。
+    exclude 为另一个收集器，其中已有的URL同样视为重复（例如普通新闻排除头条新闻）。
+    """
+
+    def __init__(self, exclude: Optional["CandidateCollector"] = None, keep_query: bool = False):
+        self.exclude = exclude
+        self.keep_query = keep_query
+        self.articles: List[Dict] = []
+        self._urls = set()
+
+    def __contains__(self, url: str) -> bool:
+        key = canonicalize_url(url, self.keep_query)
+        return key in self._urls or (self.exclude is not None and key in self.exclude._urls)
+
+    def __len__(self) -> int:
+        return len(self.articles)
+
+    def add(self, article: Dict) -> bool:
+        """收集文章，文章的URL保持不变，规范化后的URL已存在时返回 False"""
+        key = canonicalize_url(article["url"], self.keep_query)
+        if key in self._urls or (self.exclude is not None and key in self.exclude._urls):
+            return False
+        self._urls.add(key)
+        self.articles.append(article)
+        return True
@@ -0,0 +1,151 @@
+"""
+只追加的JSONL爬取日志，每篇文章一行紧凑JSON，按站点和日期分文件
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, Iterator, Optional
+
+# 写入时URL放在第一个字段，读取时无需解码整行即可取出URL
+URL_PREFIX = re.compile(rb'^\{"url":"((?:[^"\\]|\\.)*)"')
+
+
+def encode_article(article: Dict) -> str:
+    record = {"url": article.get("url", "")}
+    record.update(article)
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def line_key(line: bytes) -> Optional[bytes]:
+    """取出一行记录的URL，没有URL的文章以标题作为键"""
+    match = URL_PREFIX.match(line)
+    if match and match.group(1):
+        return match.group(1)
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    return (record.get("url") or f"title:{record.get('title', '')}").encode("utf-8")
+
+
+def article_key(article: Dict) -> str:
+    return article.get("url") or f"title:{article.get('title', '')}"
+
+
+def repair_tail(path: str, chunk_size: int = 65536):
+    """截掉文件末尾写入中断产生的不完整行，避免下一条记录接在残行后面一起被丢弃"""
+    try:
+        f = open(path, "rb+")
+    except FileNotFoundError:
+        return
+    with f:
+        end = f.seek(0, os.SEEK_END)
+        if end == 0:
+            return
+        f.seek(end - 1)
+        if f.read(1) == b"\n":
+            return
+        # 从末尾向前查找最后一个换行符
+        position = end
+        while position > 0:
+            start = max(0, position - chunk_size)
+            f.seek(start)
+            index = f.read(position - start).rfind(b"\n")
+            if index >= 0:
+                f.truncate(start + index + 1)
+                return
+            position = start
+        f.truncate(0)
+
+
+class JsonlWriter:
+    """JSONL追加写入器
+
+    每行写入后立即 flush 到操作系统，累计 fsync_every 行或距离上次 fsync 超过
+    fsync_interval 秒时才调用 fsync，在进程崩溃时最多丢失尚未落盘的一小批记录。
+    written 记录本进程写入的每个URL最后一行的摘要，用于判断文章是否需要重新写入。
+    """
+
+    def __init__(self, path: str, fsync_every: int = 20, fsync_interval: float = 5):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.written: Dict[str, bytes] = {}
+        repair_tail(path)
+        self._file = open(path, "a", encoding="utf-8")
+        self._pending = 0
+        self._synced_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def is_current(self, article: Dict) -> bool:
+        """文章与本进程最后一次写入的同一URL的记录完全相同"""
+        line = encode_article(article)
+        return self.written.get(article_key(article)) == hashlib.sha1(line.encode("utf-8")).digest()
+
+    def write(self, article: Dict):
+        line = encode_article(article)
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self.written[article_key(article)] = hashlib.sha1(line.encode("utf-8")).digest()
+            self._pending += 1
+            if self._pending >= self.fsync_every or time.monotonic() - self._synced_at >= self.fsync_interval:
+                self._sync()
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self._synced_at = time.monotonic()
+
+    def sync(self):
+        with self._lock:
+            if self._pending:
+                self._sync()
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            if self._pending:
+                self._sync()
+            self._file.close()
+
+
+def iter_jsonl(path: str) -> Iterator[Dict]:
+    """逐行读取JSONL文件中的文章
+
+    同一URL出现多次时以最后一次写入为准。第一遍只记录每个URL最后一行的位置，
+    第二遍按文件顺序解码这些行，内存占用与文章正文的大小无关。
+    写入中断产生的不完整行会被跳过。
+    """
+    last_offsets: Dict[bytes, int] = {}
+    with open(path, "rb") as f:
+        offset = 0
+        for line in f:
+            if line.endswith(b"\n"):
+                key = line_key(line)
+                if key is not None:
+                    last_offsets[key] = offset
+            offset += len(line)
+
+        for offset in sorted(last_offsets.values()):
+            f.seek(offset)
+            try:
+                yield json.loads(f.readline())
+            except ValueError:
+                continue
+
+
+def count_jsonl(path: str) -> int:
+    """统计JSONL文件中不重复的文章数"""
+    keys = set()
+    with open(path, "rb") as f:
+        for line in f:
+            if line.endswith(b"\n"):
+                key = line_key(line)
+                if key is not None:
+                    keys.add(key)
+    return len(keys)
@@ -0,0 +1,189 @@
+"""
+数据目录索引，维护 (站点, 日期) 到文章文件元数据的映射，避免每次请求都扫描数据目录
+"""
+import bisect
+import os
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from ..config.config import CRAWLER_CONFIG
+from .article_store import get_article_store
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+
+def file_pattern(extension: str = ".json"):
+    """文章文件名的匹配模式，文件名格式: @site_name_YYYYMMDD{extension}"""
+    return re.compile(r"^@(?P<site>.+)_(?P<date>\d{8})" + re.escape(extension) + "$")
+
+
+FILE_PATTERN = file_pattern(".json")
+
+
+def count_json_articles(path: str) -> int:
+    return len(get_article_store().load(path))
+
+
+def file_site_name(name: str) -> str:
+    """将站点显示名称转换为文件名中的站点名，例如 "BBC News" -> "bbc_news" """
+    return name.lower().replace(' ', '_')
+
+
+class CatalogEntry:
+    """一个文章文件的元数据"""
+
+    __slots__ = ("path", "site", "date", "mtime", "size", "_count", "_counter")
+
+    def __init__(self, path: str, site: str, date: str, mtime: float, size: int, count: Optional[int] = None,
+                 counter: Callable[[str], int] = count_json_articles):
+        self.path = path
+        self.site = site
+        self.date = date
+        self.mtime = mtime
+        self.size = size
+        self._count = count
+        self._counter = counter
+
+    @property
+    def count(self) -> int:
+        """文章数量，未知时读取文件（文件读取有缓存）"""
+        if self._count is None:
+            try:
+                self._count = self._counter(self.path)
+            except Exception as e:
+                print(f"读取JSON文件失败: {str(e)}")
+                return 0
+        return self._count
+
+    def to_dict(self) -> Dict:
+        return {
+            "site": self.site,
+            "date": self.date,
+            "file": os.path.basename(self.path),
+            "mtime": self.mtime,
+            "size": self.size,
+            "count": self.count
+        }
+
+
+class DataCatalog:
+    """数据目录索引
+
+    save_to_json 写入文件后调用 record 增量更新索引。为了发现其他进程写入的文件，
+    查询时最多每 check_interval 秒检查一次目录的 mtime，目录变化或距离上次扫描
+    超过 rescan_interval 秒时重新扫描整个目录。
+    """
+
+    def __init__(self, data_dir: str = DATA_DIR, config: Dict = None, extension: str = ".json",
+                 counter: Callable[[str], int] = count_json_articles):
+        config = config or CRAWLER_CONFIG.get("catalog", {})
+        self.data_dir = data_dir
+        self.pattern = file_pattern(extension)
+        self.counter = counter
+        self.check_interval = config.get("check_interval", 2)
+        self.rescan_interval = config.get("rescan_interval", 60)
+        self._entries: Dict[str, Dict[str, CatalogEntry]] = {}
+        self._dates: Dict[str, List[str]] = {}
+        self._latest: Dict[str, CatalogEntry] = {}
+        self._all_dates: Dict[str, int] = {}
+        self._sorted_all_dates: List[str] = []
+        self._dir_mtime = None
+        self._checked_at = 0.0
+        self._scanned_at = 0.0
+        self._lock = threading.RLock()
+
+    def _add(self, entry: CatalogEntry):
+        site_entries = self._entries.setdefault(entry.site, {})
+        if entry.date not in site_entries:
+            bisect.insort(self._dates.setdefault(entry.site, []), entry.date)
+            self._all_dates[entry.date] = self._all_dates.get(entry.date, 0) + 1
+            if self._all_dates[entry.date] == 1:
+                bisect.insort(self._sorted_all_dates, entry.date)
+        site_entries[entry.date] = entry
+        latest = self._latest.get(entry.site)
+        if latest is None or latest.date == entry.date or entry.mtime >= latest.mtime:
+            self._latest[entry.site] = entry
+
+    def rescan(self):
+        """重新扫描数据目录，重建索引"""
+        with self._lock:
+            self._entries = {}
+            self._dates = {}
+            self._latest = {}
+            self._all_dates = {}
+            self._sorted_all_dates = []
+            now = time.monotonic()
+            self._checked_at = self._scanned_at = now
+            if not os.path.isdir(self.data_dir):
+                self._dir_mtime = None
+                return
+
+            self._dir_mtime = os.stat(self.data_dir).st_mtime_ns
+            with os.scandir(self.data_dir) as it:
+                for item in it:
+                    match = self.pattern.match(item.name)
+                    if not match or not item.is_file():
+                        continue
+                    stat = item.stat()
+                    self._add(CatalogEntry(item.path, match.group("site"), match.group("date"),
+                                           stat.st_mtime, stat.st_size, counter=self.counter))
+
+    def _maybe_refresh(self):
+        now = time.monotonic()
+        if self._scanned_at and now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            self._checked_at = now
+            try:
+                dir_mtime = os.stat(self.data_dir).st_mtime_ns
+            except FileNotFoundError:
+                dir_mtime = None
+            if (not self._scanned_at or dir_mtime != self._dir_mtime
+                    or now - self._scanned_at >= self.rescan_interval):
+                self.rescan()
+
+    def record(self, path: str, count: Optional[int] = None):
+        """记录新写入或更新的文件"""
+        match = self.pattern.match(os.path.basename(path))
+        if not match:
+            return
+        stat = os.stat(path)
+        with self._lock:
+            self._add(CatalogEntry(path, match.group("site"), match.group("date"),
+                                   stat.st_mtime, stat.st_size, count, self.counter))
+            # 新建文件会改变目录的mtime，已记录的写入不需要再触发重新扫描
+            if self._scanned_at and os.path.dirname(os.path.abspath(path)) == os.path.abspath(self.data_dir):
+                self._dir_mtime = os.stat(self.data_dir).st_mtime_ns
+
+    def get(self, site: str, date: str) -> Optional[CatalogEntry]:
+        """获取站点指定日期的文件"""
+        self._maybe_refresh()
+        with self._lock:
+            return self._entries.get(site, {}).get(date)
+
+    def latest(self, site: str) -> Optional[CatalogEntry]:
+        """获取站点最新的文件，按文件修改时间比较"""
+        self._maybe_refresh()
+        with self._lock:
+            return self._latest.get(site)
+
+    def dates(self, site: Optional[str] = None) -> List[str]:
+        """获取可用日期列表（最新的在前），site 为空时返回所有站点的日期"""
+        self._maybe_refresh()
+        with self._lock:
+            dates = self._sorted_all_dates if site is None else self._dates.get(site, [])
+            return dates[::-1]
+
+    def sites(self) -> List[str]:
+        self._maybe_refresh()
+        with self._lock:
+            return list(self._entries.keys())
+
+
+catalog = DataCatalog()
+
+
+def get_catalog() -> DataCatalog:
+    """获取进程级数据目录索引"""
+    return catalog
@@ -0,0 +1,65 @@
+"""
+解析文档缓存，同一份HTML在多次解析之间共享一棵BeautifulSoup文档树
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+from bs4 import BeautifulSoup
+from ..config.config import CRAWLER_CONFIG
+
+
+class DocumentCache:
+    """按HTML字符串对象本身缓存解析结果
+
+    缓存键为 (id(html), parser)，并保存对HTML字符串的引用，命中时再用 is 比较，
+    因此只有同一个字符串对象才会共享文档树，不需要对数兆字节的HTML计算哈希。
+    缓存的文档树应视为只读。
+    """
+
+    def __init__(self, max_size: int = None):
+        self.max_size = max_size or CRAWLER_CONFIG.get("document_cache_size", 4)
+        self._entries: "OrderedDict[Tuple[int, str], Tuple[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, html: str, parser: str = "lxml", factory: Optional[Callable[[str], Any]] = None):
+        """获取HTML的文档树，未命中时解析并缓存
+
+        factory 为自定义解析函数，用于非BeautifulSoup的文档树，此时 parser 仅作为缓存键的一部分。
+        """
+        key = (id(html), parser)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is html:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        soup = factory(html) if factory else BeautifulSoup(html, parser)
+        with self._lock:
+            self._entries[key] = (html, soup)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return soup
+
+    def release(self, html: str):
+        """释放HTML对应的所有文档树，页面解析完成后调用以尽早回收内存"""
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry[0] is html]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+document_cache = DocumentCache()
+
+
+def parse_document(html: str, parser: str = "lxml") -> BeautifulSoup:
+    """解析HTML，同一个HTML字符串对象只解析一次"""
+    return document_cache.get(html, parser)
+
+
+def release_document(html: str):
+    """释放HTML对应的缓存文档树"""
+    document_cache.release(html)
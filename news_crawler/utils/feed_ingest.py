@@ -0,0 +1,178 @@
+"""
+RSS源采集，并发获取多个源并在线程池中解析，只返回之前没有见过的条目
+
+每个源的状态（上次提交的内容指纹和已见过的条目GUID）保存在数据目录中：
+    - HTTP层由磁盘HTTP缓存按源保存 ETag / Last-Modified，内容未变化时服务器返回304
+    - 源内容与上次提交时相同则跳过解析
+    - 已见过的条目不会再次返回
+状态只在调用 commit() 后写入，爬取中途失败时下次仍会返回这些条目。
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+import feedparser
+from ..config.config import CRAWLER_CONFIG
+from .data_catalog import DATA_DIR
+from .http_cache import CacheStats
+from .http_client import get_http_client
+
+RSS_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
+    "Accept": "application/rss+xml,application/xml;q=0.9,*/*;q=0.8",
+}
+
+
+def entry_guid(entry) -> Optional[str]:
+    """条目的唯一标识，优先使用GUID，没有时使用链接"""
+    return entry.get("id") or entry.get("guid") or entry.get("link")
+
+
+class FeedState:
+    """RSS源状态文件，按源URL保存内容指纹和已见过的GUID（最近的在后）"""
+
+    def __init__(self, path: str, max_seen: int = 2000):
+        self.path = path
+        self.max_seen = max_seen
+        self._feeds: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._feeds = json.load(f)
+        except FileNotFoundError:
+            self._feeds = {}
+        except ValueError as e:
+            print(f"RSS源状态文件损坏，重新开始: {str(e)}")
+            self._feeds = {}
+
+    def fingerprint(self, feed_url: str) -> Optional[str]:
+        return self._feeds.get(feed_url, {}).get("fingerprint")
+
+    def seen(self) -> set:
+        """所有源已见过的GUID，同一篇文章出现在多个源中时只返回一次"""
+        return {guid for feed in self._feeds.values() for guid in feed.get("seen", [])}
+
+    def update(self, feed_url: str, fingerprint: Optional[str], guids: List[str]):
+        with self._lock:
+            feed = self._feeds.setdefault(feed_url, {"seen": []})
+            seen = feed["seen"]
+            known = set(seen)
+            seen.extend(guid for guid in guids if guid not in known)
+            feed["seen"] = seen[-self.max_seen:]
+            feed["fingerprint"] = fingerprint
+            feed["updated_at"] = time.strftime("%Y-%m-%d %H:%M:%S")
+
+    def save(self):
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._feeds, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+
+class FeedIngestor:
+    """一个站点的RSS源采集器
+
+    fetch_new() 返回 [(源URL, 条目)]，条目为 feedparser 的解析结果；
+    处理并保存完这些条目后调用 commit() 记录已见过的条目。
+    """
+
+    def __init__(self, site_id: str, feeds: List[str], state_path: str = None, timeout: float = 30):
+        config = CRAWLER_CONFIG.get("feeds", {})
+        self.site_id = site_id
+        self.feeds = feeds
+        self.timeout = timeout
+        self.state = FeedState(
+            state_path or os.path.join(config.get("state_dir") or DATA_DIR, f"@{site_id}_feeds.json"),
+            config.get("max_seen", 2000)
+        )
+        self._pending: Dict[str, Tuple[str, List[str]]] = {}
+        self.stats = {"unchanged": 0, "parsed": 0, "new": 0, "seen": 0}
+
+    async def _fetch_feed(self, feed_url: str, seen: set, cache_stats: Optional[CacheStats]) -> List:
+        print(f"从RSS源获取文章: {feed_url}")
+        response = await get_http_client().get_cached(feed_url, headers=RSS_HEADERS, timeout=self.timeout,
+                                                      stats=cache_stats)
+        if response.status != 200:
+            print(f"获取RSS源失败，状态码: {response.status}, URL: {feed_url}")
+            return []
+
+        content = response.text
+        if not content or len(content) < 100:
+            print(f"RSS源返回内容过短: {feed_url}")
+            return []
+        if not ('<rss' in content or '<feed' in content):
+            print(f"返回内容不是有效的RSS格式: {feed_url}")
+            return []
+
+        fingerprint = hashlib.sha1(content.encode("utf-8")).hexdigest()
+        if fingerprint == self.state.fingerprint(feed_url):
+            # 内容与上次提交时相同，不需要解析
+            self.stats["unchanged"] += 1
+            return []
+
+        # feedparser 是纯Python解析器，放到线程池中运行，不阻塞事件循环
+        loop = asyncio.get_running_loop()
+        feed = await loop.run_in_executor(None, feedparser.parse, content)
+        self.stats["parsed"] += 1
+        if not feed.entries:
+            print(f"RSS源没有任何条目: {feed_url}")
+            return []
+
+        entries, guids = [], []
+        for entry in feed.entries:
+            guid = entry_guid(entry)
+            if guid is None:
+                continue
+            guids.append(guid)
+            if guid in seen:
+                self.stats["seen"] += 1
+            else:
+                seen.add(guid)
+                entries.append(entry)
+        self.stats["new"] += len(entries)
+        self._pending[feed_url] = (fingerprint, guids)
+        return entries
+
+    async def fetch_new(self, cache_stats: Optional[CacheStats] = None) -> List[Tuple[str, object]]:
+        """并发获取所有源，返回之前没有见过的条目，按源的顺序排列"""
+        self._pending = {}
+        self.stats = {"unchanged": 0, "parsed": 0, "new": 0, "seen": 0}
+        seen = self.state.seen()
+        results = await asyncio.gather(
+            *(self._fetch_feed(feed_url, seen, cache_stats) for feed_url in self.feeds),
+            return_exceptions=True
+        )
+
+        entries = []
+        for feed_url, result in zip(self.feeds, results):
+            if isinstance(result, asyncio.TimeoutError):
+                print(f"获取RSS源超时: {feed_url}")
+            elif isinstance(result, Exception):
+                print(f"获取RSS源出错: {feed_url}, 错误: {str(result)}")
+            else:
+                entries.extend((feed_url, entry) for entry in result)
+        return entries
+
+    def commit(self, exclude=()):
+        """记录本次获取的条目为已见过
+
+        exclude 为本次没有处理的条目GUID，这些条目下次仍会返回；
+        包含这类条目的源不记录内容指纹，下次即使内容不变也会重新解析。
+        """
+        exclude = set(exclude)
+        for feed_url, (fingerprint, guids) in self._pending.items():
+            kept = [guid for guid in guids if guid not in exclude]
+            self.state.update(feed_url, fingerprint if len(kept) == len(guids) else None, kept)
+        self._pending = {}
+        try:
+            self.state.save()
+        except Exception as e:
+            print(f"保存RSS源状态失败: {str(e)}")
@@ -0,0 +1,85 @@
+"""
+有界抓取调度器，统一限制全局并发、单主机并发和单主机请求速率
+"""
+import asyncio
+import time
+from urllib.parse import urlparse
+from typing import Any, Awaitable, Callable, Dict, Iterable, List
+from ..config.config import CRAWLER_CONFIG
+
+
+class TokenBucket:
+    """令牌桶，用于平滑同一主机的请求速率"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    async def acquire(self):
+        """获取一个令牌，令牌不足时等待补充"""
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class FetchScheduler:
+    """抓取调度器
+
+    每个任务先占用所属主机的并发槽位，再通过该主机的令牌桶，
+    最后占用全局在途请求槽位，然后才真正执行抓取。
+    """
+
+    def __init__(self, config: Dict = None):
+        config = config or CRAWLER_CONFIG.get("fetch_scheduler", {})
+        self.max_in_flight = config.get("max_in_flight", 16)
+        self.per_host = config.get("per_host", 4)
+        self.requests_per_second = config.get("requests_per_second", 2)
+        self.burst = config.get("burst", self.per_host)
+        self._global_semaphore = asyncio.Semaphore(self.max_in_flight)
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._host_buckets: Dict[str, TokenBucket] = {}
+
+    def _host_semaphore(self, host: str) -> asyncio.Semaphore:
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.per_host)
+        return self._host_semaphores[host]
+
+    def _host_bucket(self, host: str) -> TokenBucket:
+        if host not in self._host_buckets:
+            self._host_buckets[host] = TokenBucket(self.requests_per_second, self.burst)
+        return self._host_buckets[host]
+
+    async def run(self, url: str, task: Callable[[], Awaitable[Any]]) -> Any:
+        """在调度限制下执行一次抓取"""
+        host = urlparse(url).netloc.lower()
+        async with self._host_semaphore(host):
+            await self._host_bucket(host).acquire()
+            async with self._global_semaphore:
+                return await task()
+
+    async def gather(self, items: Iterable, url_getter: Callable[[Any], str],
+                     worker: Callable[[Any], Awaitable[Any]]) -> List[Any]:
+        """并发处理一组条目，结果顺序与输入一致，异常作为结果返回"""
+        tasks = [self.run(url_getter(item), lambda item=item: worker(item)) for item in items]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# 调度器内部的信号量与事件循环绑定，因此每个事件循环一个实例
+_schedulers: Dict[asyncio.AbstractEventLoop, FetchScheduler] = {}
+
+
+def get_fetch_scheduler() -> FetchScheduler:
+    """获取当前事件循环共享的抓取调度器"""
+    loop = asyncio.get_running_loop()
+    for closed_loop in [l for l in _schedulers if l.is_closed()]:
+        del _schedulers[closed_loop]
+    if loop not in _schedulers:
+        _schedulers[loop] = FetchScheduler()
+    return _schedulers[loop]
@@ -0,0 +1,124 @@
+"""
+HTML文档后端，为爬虫提供统一的 select / select_one / text / attr 接口
+
+soup 后端基于BeautifulSoup，兼容性最好；lxml 后端直接使用 lxml.html 和 cssselect，
+在数兆字节的首页上解析和选择速度明显更快。站点可以通过 NEWS_SITES 中的 parser_backend 选择后端。
+"""
+from functools import lru_cache
+from typing import Any, List, Optional
+from ..config.config import CRAWLER_CONFIG
+from .document_cache import document_cache
+
+# 尝试导入lxml后端依赖，如果不可用则回退到BeautifulSoup
+try:
+    import lxml.html
+    from lxml.cssselect import CSSSelector
+    LXML_BACKEND_AVAILABLE = True
+except ImportError:
+    LXML_BACKEND_AVAILABLE = False
+
+
+class SoupBackend:
+    """BeautifulSoup后端"""
+
+    name = "soup"
+
+    def __init__(self, parser: str = "lxml"):
+        self.parser = parser
+
+    def parse(self, html: str):
+        return document_cache.get(html, self.parser)
+
+    def select(self, node, selector: str) -> List[Any]:
+        return node.select(selector)
+
+    def select_one(self, node, selector: str) -> Optional[Any]:
+        return node.select_one(selector)
+
+    def text(self, node, strip: bool = True) -> str:
+        return node.get_text(strip=strip)
+
+    def attr(self, node, name: str, default: str = "") -> str:
+        value = node.get(name, default)
+        # class 等多值属性在BeautifulSoup中为列表
+        return " ".join(value) if isinstance(value, list) else value
+
+
+@lru_cache(maxsize=256)
+def compile_selector(selector: str):
+    """编译CSS选择器，相同选择器只编译一次"""
+    return CSSSelector(selector, translator="html")
+
+
+# BeautifulSoup的 get_text 不包含这些元素中的文本
+SKIPPED_TEXT_TAGS = frozenset(("script", "style", "template"))
+
+
+def iter_text(node):
+    """按文档顺序遍历节点的文本，跳过注释和 SKIPPED_TEXT_TAGS 元素中的文本（保留其后的tail），
+    与BeautifulSoup后端的结果一致"""
+    if node.text:
+        yield node.text
+    stack = [(node, iter(node))]
+    while stack:
+        element, children = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            if element is not node and element.tail:
+                yield element.tail
+        elif isinstance(child.tag, str) and child.tag not in SKIPPED_TEXT_TAGS:
+            if child.text:
+                yield child.text
+            stack.append((child, iter(child)))
+        elif child.tail:
+            yield child.tail
+
+
+def parse_lxml(html: str):
+    try:
+        return lxml.html.document_fromstring(html)
+    except Exception:
+        # 空文档或无法解析的文档返回空树，与BeautifulSoup的行为保持一致
+        return lxml.html.document_fromstring("<html></html>")
+
+
+class LxmlBackend:
+    """lxml.html + cssselect后端"""
+
+    name = "lxml"
+
+    def parse(self, html: str):
+        return document_cache.get(html, "lxml.html", factory=parse_lxml)
+
+    def select(self, node, selector: str) -> List[Any]:
+        return compile_selector(selector)(node)
+
+    def select_one(self, node, selector: str) -> Optional[Any]:
+        elements = self.select(node, selector)
+        return elements[0] if elements else None
+
+    def text(self, node, strip: bool = True) -> str:
+        if not strip:
+            return "".join(iter_text(node))
+        return "".join(part.strip() for part in iter_text(node))
+
+    def attr(self, node, name: str, default: str = "") -> str:
+        return node.get(name, default)
+
+
+BACKENDS = {
+    "soup": SoupBackend,
+    "lxml": LxmlBackend
+}
+
+
+def get_backend(name: Optional[str] = None):
+    """按名称获取文档后端，未指定时使用全局默认后端"""
+    name = name or CRAWLER_CONFIG.get("parser_backend", "soup")
+    if name not in BACKENDS:
+        raise ValueError(f"未知的HTML解析后端: {name}")
+    if name == "lxml" and not LXML_BACKEND_AVAILABLE:
+        print("lxml后端不可用，请安装cssselect包，使用BeautifulSoup后端")
+        name = "soup"
+    return BACKENDS[name]()
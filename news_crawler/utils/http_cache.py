@@ -0,0 +1,285 @@
+"""
+磁盘HTTP缓存，按URL保存响应正文和 ETag / Last-Modified，支持条件请求重新验证
+
+缓存保存在SQLite数据库中（WAL模式），正文使用zlib压缩。
+    - 响应在 Cache-Control: max-age（或 Expires）有效期内直接使用缓存，不发送请求
+    - 过期后带 If-None-Match / If-Modified-Since 重新验证，304时继续使用缓存
+    - no-store 的响应不缓存，no-cache 的响应每次都重新验证
+    - 总大小超过 max_bytes 或条目数超过 max_entries 时按最近使用时间淘汰
+    - 缓存键包含影响响应内容的请求头（KEY_HEADERS），并按响应的 Vary 头校验请求头是否一致
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from email.utils import parsedate_to_datetime
+from typing import Dict, NamedTuple, Optional
+from ..config.config import CRAWLER_CONFIG
+from .data_catalog import DATA_DIR
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS http_cache (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    expires_at REAL NOT NULL,
+    no_cache INTEGER NOT NULL,
+    final_url TEXT NOT NULL,
+    content_type TEXT,
+    vary TEXT,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_http_cache_last_used ON http_cache (last_used);
+"""
+
+MAX_AGE_PATTERN = re.compile(r"(?:^|,)\s*max-age\s*=\s*\"?(\d+)\"?", re.IGNORECASE)
+
+# 计入缓存键的请求头，不同取值的请求分别缓存（例如RSS和网页使用不同的 Accept）
+KEY_HEADERS = ("accept", "accept-language", "authorization", "cookie")
+
+
+def lower_headers(headers: Optional[Dict[str, str]]) -> Dict[str, str]:
+    return {key.lower(): value for key, value in (headers or {}).items()}
+
+
+def cache_key(url: str, headers: Optional[Dict[str, str]] = None) -> str:
+    """URL加上影响响应内容的请求头的摘要，没有这些请求头时就是URL本身"""
+    lowered = lower_headers(headers)
+    parts = [f"{name}:{lowered[name]}" for name in KEY_HEADERS if lowered.get(name)]
+    if not parts:
+        return url
+    return f"{url}#{hashlib.sha1(chr(10).join(parts).encode('utf-8')).hexdigest()[:16]}"
+
+
+def vary_values(vary: str, headers: Optional[Dict[str, str]]) -> Optional[Dict[str, str]]:
+    """响应 Vary 头列出的请求头在本次请求中的取值，Vary: * 时返回 None（不可缓存）"""
+    names = [name.strip().lower() for name in vary.split(",") if name.strip()]
+    if "*" in names:
+        return None
+    lowered = lower_headers(headers)
+    return {name: lowered.get(name, "") for name in names}
+
+
+class CacheStats:
+    """一次爬取的缓存统计
+
+    hits         缓存未过期，直接使用缓存
+    revalidated  缓存过期，服务器返回304，继续使用缓存
+    misses       没有缓存或内容已变化，下载完整响应
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def record(self, outcome: str):
+        setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def to_dict(self) -> Dict[str, int]:
+        return {"hits": self.hits, "revalidated": self.revalidated, "misses": self.misses}
+
+
+class CachedEntry(NamedTuple):
+    etag: Optional[str]
+    last_modified: Optional[str]
+    expires_at: float
+    no_cache: bool
+    final_url: str
+    text: str
+    vary: Dict[str, str]
+
+    @property
+    def fresh(self) -> bool:
+        return not self.no_cache and self.expires_at > time.time()
+
+    def matches(self, headers: Optional[Dict[str, str]]) -> bool:
+        """本次请求的请求头与缓存时 Vary 列出的请求头取值一致"""
+        lowered = lower_headers(headers)
+        return all(lowered.get(name, "") == value for name, value in self.vary.items())
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """重新验证时附加的请求头"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def cache_policy(headers: Dict[str, str], default_ttl: float = 0):
+    """根据响应头确定缓存策略，返回 (是否可缓存, 过期时间戳, 是否每次重新验证)"""
+    lowered = {key.lower(): value for key, value in headers.items()}
+    cache_control = lowered.get("cache-control", "").lower()
+    directives = {part.strip().split("=")[0] for part in cache_control.split(",") if part.strip()}
+    if "no-store" in directives:
+        return False, 0.0, False
+
+    now = time.time()
+    no_cache = "no-cache" in directives
+    match = MAX_AGE_PATTERN.search(cache_control)
+    if match:
+        expires_at = now + int(match.group(1))
+    elif lowered.get("expires"):
+        try:
+            expires_at = parsedate_to_datetime(lowered["expires"]).timestamp()
+        except (TypeError, ValueError):
+            expires_at = now
+    else:
+        expires_at = now + default_ttl
+
+    # 既没有有效期也没有验证器的响应无法复用
+    has_validator = bool(lowered.get("etag") or lowered.get("last-modified"))
+    return (has_validator or expires_at > now), expires_at, no_cache
+
+
+class HttpCache:
+    """SQLite实现的磁盘HTTP缓存，每个线程使用独立的连接"""
+
+    def __init__(self, path: str = None, max_bytes: int = None, max_entries: int = None,
+                 default_ttl: float = None):
+        config = CRAWLER_CONFIG.get("http_cache", {})
+        self.path = path or config.get("path") or os.path.join(DATA_DIR, "http_cache.db")
+        self.max_bytes = max_bytes or config.get("max_bytes", 200 * 1024 * 1024)
+        self.max_entries = max_entries or config.get("max_entries", 5000)
+        self.default_ttl = default_ttl if default_ttl is not None else config.get("default_ttl", 0)
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        connection = self._connection()
+        connection.executescript(SCHEMA)
+        # 旧版本创建的数据库没有 vary 列
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(http_cache)")}
+        if "vary" not in columns:
+            with connection:
+                connection.execute("ALTER TABLE http_cache ADD COLUMN vary TEXT")
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Optional[CachedEntry]:
+        """读取缓存条目，url 为缓存键；请求头与缓存时 Vary 列出的取值不一致时返回 None"""
+        row = self._connection().execute(
+            "SELECT etag, last_modified, expires_at, no_cache, final_url, vary, body FROM http_cache WHERE url = ?",
+            (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, expires_at, no_cache, final_url, vary, body = row
+        entry = CachedEntry(etag, last_modified, expires_at, bool(no_cache), final_url,
+                            zlib.decompress(body).decode("utf-8"), json.loads(vary) if vary else {})
+        return entry if entry.matches(headers) else None
+
+    def touch(self, url: str, headers: Optional[Dict[str, str]] = None):
+        """记录缓存被使用；传入304响应头时同时更新有效期和验证器"""
+        connection = self._connection()
+        with connection:
+            if headers is None:
+                connection.execute("UPDATE http_cache SET last_used = ? WHERE url = ?", (time.time(), url))
+                return
+            _, expires_at, no_cache = cache_policy(headers, self.default_ttl)
+            lowered = {key.lower(): value for key, value in headers.items()}
+            connection.execute(
+                "UPDATE http_cache SET expires_at = ?, no_cache = ?, last_used = ?, "
+                "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                (expires_at, 1 if no_cache else 0, time.time(),
+                 lowered.get("etag"), lowered.get("last-modified"), url)
+            )
+
+    def store(self, url: str, text: str, headers: Dict[str, str], final_url: str,
+              request_headers: Optional[Dict[str, str]] = None) -> bool:
+        """保存200响应，url 为缓存键，不可缓存时删除旧条目，返回是否已保存"""
+        cacheable, expires_at, no_cache = cache_policy(headers, self.default_ttl)
+        vary = vary_values(lower_headers(headers).get("vary", ""), request_headers)
+        if vary is None:
+            cacheable = False
+        connection = self._connection()
+        if not cacheable:
+            with connection:
+                connection.execute("DELETE FROM http_cache WHERE url = ?", (url,))
+            return False
+
+        lowered = {key.lower(): value for key, value in headers.items()}
+        body = zlib.compress(text.encode("utf-8"))
+        now = time.time()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO http_cache (url, etag, last_modified, expires_at, no_cache, final_url, "
+                "content_type, vary, body, size, stored_at, last_used) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, lowered.get("etag"), lowered.get("last-modified"), expires_at, 1 if no_cache else 0,
+                 final_url, lowered.get("content-type"), json.dumps(vary) if vary else None, body, len(body), now, now)
+            )
+        self.evict()
+        return True
+
+    def evict(self):
+        """按最近使用时间淘汰条目，直到总大小和条目数都在限制之内"""
+        connection = self._connection()
+        total_size, count = connection.execute("SELECT COALESCE(SUM(size), 0), COUNT(*) FROM http_cache").fetchone()
+        if total_size <= self.max_bytes and count <= self.max_entries:
+            return
+
+        removed = []
+        for url, size in connection.execute("SELECT url, size FROM http_cache ORDER BY last_used"):
+            if total_size <= self.max_bytes and count <= self.max_entries:
+                break
+            removed.append((url,))
+            total_size -= size
+            count -= 1
+        with connection:
+            connection.executemany("DELETE FROM http_cache WHERE url = ?", removed)
+
+    def stats(self) -> Dict:
+        total_size, count = self._connection().execute(
+            "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM http_cache"
+        ).fetchone()
+        return {"entries": count, "bytes": total_size, "max_bytes": self.max_bytes}
+
+    def clear(self):
+        connection = self._connection()
+        with connection:
+            connection.execute("DELETE FROM http_cache")
+
+    def close(self):
+        with self._lock:
+            for connection in self._connections:
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+            self._connections.clear()
+        self._local = threading.local()
+
+
+_http_cache: Optional[HttpCache] = None
+_http_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> Optional[HttpCache]:
+    """获取进程级HTTP缓存，配置中禁用时返回 None"""
+    global _http_cache
+    if not CRAWLER_CONFIG.get("http_cache", {}).get("enabled", True):
+        return None
+    if _http_cache is None:
+        with _http_cache_lock:
+            if _http_cache is None:
+                _http_cache = HttpCache()
+    return _http_cache
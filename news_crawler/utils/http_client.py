@@ -0,0 +1,132 @@
+"""
+共享HTTP客户端，为所有爬虫和代理管理器提供按主机复用连接的aiohttp会话
+"""
+import asyncio
+import functools
+import aiohttp
+from typing import Dict, NamedTuple, Optional
+from ..config.config import CRAWLER_CONFIG
+from .http_cache import CacheStats, cache_key, get_http_cache
+
+
+class HttpResponse(NamedTuple):
+    """已读取完毕的HTTP响应"""
+    status: int
+    text: str
+    headers: Dict[str, str]
+    url: str
+
+
+class HttpClient:
+    """进程级HTTP客户端
+
+    aiohttp会话与事件循环绑定，因此每个事件循环持有一个会话，
+    同一事件循环内的所有请求共享连接池、DNS缓存和keep-alive连接。
+    """
+
+    def __init__(self):
+        self.pool_config = CRAWLER_CONFIG.get("http_pool", {})
+        self.timeout = CRAWLER_CONFIG["timeout"]
+        self._sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        """创建带连接池的会话"""
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_config.get("limit", 100),
+            limit_per_host=self.pool_config.get("limit_per_host", 10),
+            ttl_dns_cache=self.pool_config.get("ttl_dns_cache", 300),
+            keepalive_timeout=self.pool_config.get("keepalive_timeout", 30)
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+
+    def _prune_closed_loops(self):
+        """丢弃已关闭事件循环遗留的会话"""
+        for loop in [loop for loop in self._sessions if loop.is_closed()]:
+            del self._sessions[loop]
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """获取当前事件循环的共享会话"""
+        loop = asyncio.get_running_loop()
+        self._prune_closed_loops()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            session = self._create_session()
+            self._sessions[loop] = session
+        return session
+
+    async def get(self, url: str, headers: Optional[Dict] = None, timeout=None,
+                  proxy: Optional[str] = None, ssl=None) -> HttpResponse:
+        """发送GET请求并读取完整响应
+
+        网络错误和超时会直接抛出，由调用方决定重试策略。
+        """
+        session = self.get_session()
+        kwargs = {"headers": headers, "proxy": proxy}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        if ssl is not None:
+            kwargs["ssl"] = ssl
+
+        async with session.get(url, **kwargs) as response:
+            text = await response.text()
+            return HttpResponse(response.status, text, dict(response.headers), str(response.url))
+
+    async def get_cached(self, url: str, headers: Optional[Dict] = None, timeout=None,
+                         proxy: Optional[str] = None, ssl=None,
+                         stats: Optional[CacheStats] = None) -> HttpResponse:
+        """通过磁盘HTTP缓存发送GET请求
+
+        缓存未过期时不发送请求；过期时发送条件请求，服务器返回304时使用缓存的正文，
+        返回的响应状态为200。stats 用于统计命中、重新验证和未命中次数。
+        缓存读写（SQLite和zlib压缩）在线程池中执行，不阻塞事件循环中的其他请求。
+        """
+        cache = get_http_cache()
+        if cache is None:
+            return await self.get(url, headers=headers, timeout=timeout, proxy=proxy, ssl=ssl)
+
+        loop = asyncio.get_running_loop()
+        key = cache_key(url, headers)
+        cached = await loop.run_in_executor(None, cache.get, key, headers)
+        if cached is not None and cached.fresh:
+            await loop.run_in_executor(None, cache.touch, key)
+            if stats:
+                stats.record("hits")
+            return HttpResponse(200, cached.text, {}, cached.final_url)
+
+        request_headers = dict(headers or {})
+        if cached is not None:
+            request_headers.update(cached.conditional_headers())
+        response = await self.get(url, headers=request_headers, timeout=timeout, proxy=proxy, ssl=ssl)
+
+        if response.status == 304 and cached is not None:
+            await loop.run_in_executor(None, cache.touch, key, response.headers)
+            if stats:
+                stats.record("revalidated")
+            return HttpResponse(200, cached.text, response.headers, cached.final_url)
+
+        if response.status == 200:
+            await loop.run_in_executor(None, functools.partial(
+                cache.store, key, response.text, response.headers, response.url, request_headers=headers
+            ))
+        if stats:
+            stats.record("misses")
+        return response
+
+    async def close(self):
+        """关闭当前事件循环的会话，应在事件循环结束前调用"""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.pop(loop, None)
+        if session is not None and not session.closed:
+            await session.close()
+
+
+# 进程级共享实例
+http_client = HttpClient()
+
+
+def get_http_client() -> HttpClient:
+    """获取共享HTTP客户端"""
+    return http_client
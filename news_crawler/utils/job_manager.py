@@ -0,0 +1,238 @@
+"""
+后台爬取任务管理器，在独立线程的事件循环中运行爬取任务并记录进度
+"""
+import asyncio
+import atexit
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from ..config.config import CRAWLER_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# 已结束的任务状态
+FINISHED_STATUSES = {"success", "failed", "cancelled"}
+
+
+class CrawlJob:
+    """一次爬取任务及其进度"""
+
+    def __init__(self, key: str, site_ids):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.status = "pending"
+        self.created_at = datetime.now().isoformat()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.message = ""
+        self.future = None
+        self.sites = {
+            site_id: {"status": "pending", "articles_total": 0, "articles_done": 0, "articles_reused": 0,
+                      "count": 0}
+            for site_id in site_ids
+        }
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def update_site(self, site_id: str, event: str, **data):
+        """处理爬虫上报的进度事件"""
+        with self._lock:
+            site = self.sites.setdefault(site_id, {"status": "pending", "articles_total": 0, "articles_done": 0,
+                                                   "articles_reused": 0, "count": 0})
+            if event == "started":
+                site["status"] = "running"
+            elif event == "articles_found":
+                site["articles_total"] += data.get("total", 0)
+            elif event == "article_done":
+                site["articles_done"] += 1
+            elif event == "articles_reused":
+                site["articles_reused"] += data.get("total", 0)
+            elif event == "finished":
+                site["status"] = data.get("status", "success")
+                site["count"] = data.get("count", 0)
+                site["elapsed"] = data.get("elapsed", 0.0)
+                if data.get("message"):
+                    site["message"] = data["message"]
+
+    def start(self) -> bool:
+        """标记任务开始运行，任务在开始前已被取消时返回 False"""
+        with self._lock:
+            if self.status in FINISHED_STATUSES:
+                return False
+            self.status = "running"
+            self.started_at = datetime.now().isoformat()
+            return True
+
+    def finish(self, status: str, result: Optional[Dict] = None, message: str = ""):
+        """标记任务结束"""
+        with self._lock:
+            self._finish(status, result, message)
+
+    def cancel_pending(self) -> bool:
+        """任务尚未开始运行时标记为已取消，返回是否已标记"""
+        with self._lock:
+            if self.started_at is not None or self.status in FINISHED_STATUSES:
+                return False
+            self._finish("cancelled", None, "任务已取消")
+            return True
+
+    def _finish(self, status: str, result: Optional[Dict], message: str):
+        self.status = status
+        self.result = result
+        self.message = message
+        self.finished_at = datetime.now().isoformat()
+        for site in self.sites.values():
+            if site["status"] in ("pending", "running"):
+                site["status"] = status
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "job_id": self.id,
+                "site": self.key,
+                "status": self.status,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "message": self.message,
+                "sites": {site_id: dict(site) for site_id, site in self.sites.items()},
+                "result": self.result
+            }
+
+
+class JobManager:
+    """爬取任务管理器
+
+    所有任务共享一个后台线程中的事件循环，因此HTTP连接池、抓取调度器等
+    按事件循环共享的资源在任务之间也可以复用。相同参数的任务在运行期间只会启动一次。
+    """
+
+    def __init__(self, max_jobs: int = None):
+        self.max_jobs = max_jobs or CRAWLER_CONFIG.get("max_jobs", 50)
+        self._jobs: "OrderedDict[str, CrawlJob]" = OrderedDict()
+        self._active: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """启动后台事件循环线程"""
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever, name="crawl-jobs", daemon=True)
+            self._thread.start()
+        return self._loop
+
+    def _prune(self):
+        """只保留最近的若干个已结束任务"""
+        while len(self._jobs) > self.max_jobs:
+            oldest_id = next((job_id for job_id, job in self._jobs.items() if job.finished), None)
+            if oldest_id is None:
+                break
+            del self._jobs[oldest_id]
+
+    def submit(self, key: str, scrapers: Dict[str, type]) -> Tuple[CrawlJob, bool]:
+        """提交爬取任务，返回 (任务, 是否新建)
+
+        如果相同 key 的任务正在运行，直接返回该任务。
+        """
+        with self._lock:
+            active_id = self._active.get(key)
+            if active_id and active_id in self._jobs and not self._jobs[active_id].finished:
+                return self._jobs[active_id], False
+
+            job = CrawlJob(key, scrapers.keys())
+            self._jobs[job.id] = job
+            self._active[key] = job.id
+            self._prune()
+
+        loop = self._ensure_loop()
+        job.future = asyncio.run_coroutine_threadsafe(self._run(job, scrapers), loop)
+        job.future.add_done_callback(lambda future: self._on_done(job, future))
+        logger.info(f"创建爬取任务 {job.id}: {key}")
+        return job, True
+
+    async def _run(self, job: CrawlJob, scrapers: Dict[str, type]):
+        # 延迟导入，避免与爬虫模块形成循环依赖
+        from ..scrapers.orchestrator import run_sites
+
+        if not job.start():
+            return
+        try:
+            result = await run_sites(scrapers, progress=job.update_site)
+            job.finish("success", result)
+            logger.info(f"爬取任务 {job.id} 完成: {result['count']} 条新闻")
+        except asyncio.CancelledError:
+            job.finish("cancelled", message="任务已取消")
+            logger.info(f"爬取任务 {job.id} 已取消")
+        except Exception as e:
+            job.finish("failed", message=str(e))
+            logger.error(f"爬取任务 {job.id} 失败: {str(e)}")
+        finally:
+            # 爬取协程真正结束后才释放去重占位，取消期间不会启动相同参数的任务
+            self._release(job)
+
+    def _on_done(self, job: CrawlJob, future):
+        """任务在开始运行前被取消时在这里收尾
+
+        取消 future 时回调立即执行，而爬取协程可能仍在事件循环中处理取消，
+        已开始运行的任务由 _run 收尾并释放去重占位。
+        """
+        if future.cancelled() and job.cancel_pending():
+            self._release(job)
+
+    def _release(self, job: CrawlJob):
+        """释放任务的去重占位"""
+        with self._lock:
+            if self._active.get(job.key) == job.id:
+                del self._active[job.key]
+
+    def get(self, job_id: str) -> Optional[CrawlJob]:
+        return self._jobs.get(job_id)
+
+    def list_jobs(self):
+        return [job.to_dict() for job in reversed(list(self._jobs.values()))]
+
+    def cancel(self, job_id: str) -> bool:
+        """取消正在运行的任务"""
+        job = self._jobs.get(job_id)
+        if not job or job.finished or job.future is None:
+            return False
+        return job.future.cancel()
+
+    async def _close_loop_resources(self):
+        """释放后台事件循环上的共享浏览器和连接池"""
+        from .browser_pool import close_browser_pool
+        from .http_client import get_http_client
+
+        await close_browser_pool()
+        await get_http_client().close()
+
+    def shutdown(self, timeout: float = 10):
+        """取消所有任务，关闭共享资源并停止后台事件循环"""
+        for job in list(self._jobs.values()):
+            if not job.finished and job.future is not None:
+                job.future.cancel()
+        if self._loop is None or self._loop.is_closed() or not self._loop.is_running():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._close_loop_resources(), self._loop).result(timeout)
+        except Exception as e:
+            logger.error(f"关闭爬取资源失败: {str(e)}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+job_manager = JobManager()
+atexit.register(job_manager.shutdown)
+
+
+def get_job_manager() -> JobManager:
+    """获取进程级任务管理器"""
+    return job_manager
@@ -0,0 +1,142 @@
+"""
+新闻导出，逐篇读取文章并流式写出，内存占用与导出的文章数量无关
+
+支持的格式:
+    xlsx    openpyxl 只写模式写入临时文件，写完后分块发送
+    csv     UTF-8（带BOM，Excel可直接打开）
+    ndjson  每行一篇文章的JSON
+"""
+import csv
+import io
+import json
+import os
+import tempfile
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from openpyxl import Workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from .storage import get_storage
+
+# 导出的列及表头
+EXPORT_COLUMNS = [
+    ('title', '标题'),
+    ('url', '链接'),
+    ('summary', '摘要'),
+    ('content', '内容'),
+    ('publish_time', '发布时间'),
+    ('crawl_time', '抓取时间'),
+    ('source', '来源'),
+    ('is_top_news', '是否头条')
+]
+
+EXPORT_FORMATS = {
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson")
+}
+
+# 每次发送的数据块大小
+CHUNK_SIZE = 64 * 1024
+
+
+def resolve_dates(sites: List[str], date: Optional[str] = None, start: Optional[str] = None,
+                  end: Optional[str] = None) -> List[Optional[str]]:
+    """确定导出的日期列表（从早到晚）
+
+    指定 date 时只导出当天；指定 start/end 时导出范围内所有有数据的日期；
+    都不指定时导出每个网站最新一天的数据（返回 [None]）。
+    """
+    if date:
+        return [date]
+    if not start and not end:
+        return [None]
+
+    storage = get_storage()
+    dates = set()
+    for site in sites:
+        dates.update(storage.dates(site))
+    return sorted(d for d in dates if (not start or d >= start) and (not end or d <= end))
+
+
+def iter_export_articles(sites: List[str], dates: List[Optional[str]]) -> Iterator[Dict]:
+    """按日期、网站顺序逐篇读取文章"""
+    storage = get_storage()
+    for date in dates:
+        for site in sites:
+            try:
+                yield from storage.iter_articles(site, date)
+            except Exception as e:
+                print(f"读取 {site} {date or '最新'} 的新闻失败: {str(e)}")
+
+
+def export_row(article: Dict) -> List:
+    return [article.get(key, "") for key, _ in EXPORT_COLUMNS]
+
+
+def iter_csv(articles: Iterable[Dict], rows_per_chunk: int = 200) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow([name for _, name in EXPORT_COLUMNS])
+    for index, article in enumerate(articles, 1):
+        writer.writerow(export_row(article))
+        if index % rows_per_chunk == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iter_ndjson(articles: Iterable[Dict]) -> Iterator[bytes]:
+    for article in articles:
+        record = {key: article.get(key, "") for key, _ in EXPORT_COLUMNS}
+        yield (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def clean_cell(value):
+    # Excel不允许的控制字符会导致openpyxl写入失败
+    if isinstance(value, str):
+        return ILLEGAL_CHARACTERS_RE.sub("", value)
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def iter_xlsx(articles: Iterable[Dict]) -> Iterator[bytes]:
+    """只写模式逐行写入工作表，xlsx是zip格式，写完整个文件后再分块读出"""
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("新闻数据")
+        sheet.append([name for _, name in EXPORT_COLUMNS])
+        for article in articles:
+            sheet.append([clean_cell(value) for value in export_row(article)])
+        workbook.save(path)
+
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        os.remove(path)
+
+
+def stream_export(articles: Iterable[Dict], export_format: str) -> Iterator[bytes]:
+    if export_format == "csv":
+        return iter_csv(articles)
+    if export_format == "ndjson":
+        return iter_ndjson(articles)
+    return iter_xlsx(articles)
+
+
+def peek(iterator: Iterator) -> Tuple[Optional[object], Iterator]:
+    """取出迭代器的第一项并返回还原后的迭代器，迭代器为空时第一项为 None"""
+    for first in iterator:
+        def chained():
+            yield first
+            yield from iterator
+        return first, chained()
+    return None, iter(())
@@ -0,0 +1,272 @@
+"""
+新闻查询，为 /api/news 提供分页、字段投影和过滤
+
+每个站点每天的文章按重要性预先排序并缓存，数据版本变化时才重新排序；
+多个站点的结果用 heapq.merge 归并，不需要对合并后的列表重新排序。
+指定 dedupe 或请求 cluster_id / cluster_size 字段时，同一天所有站点的文章按MinHash签名聚类，
+每个故事可以只返回最重要的一篇；默认查询不聚类，返回的字段与之前一致。
+"""
+import base64
+import heapq
+import threading
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from dateutil import parser as date_parser
+import pytz
+from .storage import get_storage, site_display_names
+from .story_clusters import StoryIndex, article_signature
+
+
+class QueryError(ValueError):
+    """查询参数错误"""
+
+
+def parse_time(value) -> Optional[float]:
+    """将发布时间解析为时间戳，无法解析时返回 None，没有时区的时间按UTC处理"""
+    if not value:
+        return None
+    try:
+        parsed = date_parser.parse(str(value))
+    except (ValueError, OverflowError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = pytz.utc.localize(parsed)
+    return parsed.timestamp()
+
+
+UNSET = object()
+
+
+class SortedEntry:
+    """预排序列表中的一项，附带排序键、解析好的发布时间和所属故事"""
+
+    __slots__ = ("key", "article", "published", "_signature", "cluster_id", "cluster_size")
+
+    def __init__(self, key: float, article: Dict):
+        self.key = key
+        self.article = article
+        self.published = parse_time(article.get("publish_time"))
+        self._signature = UNSET
+        self.cluster_id = None
+        self.cluster_size = 1
+
+    @property
+    def signature(self):
+        # 旧数据没有保存签名，聚类时才计算
+        if self._signature is UNSET:
+            self._signature = article_signature(self.article)
+        return self._signature
+
+
+class SortedNewsIndex:
+    """按 (站点, 日期) 缓存按重要性降序排列的文章列表"""
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: Dict[Tuple[str, Optional[str]], Tuple[object, List[SortedEntry]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, site: str, date: Optional[str] = None) -> List[SortedEntry]:
+        storage = get_storage()
+        version = storage.version(site, date)
+        key = (site, date)
+        with self._lock:
+            cached = self._entries.get(key)
+            if version is not None and cached is not None and cached[0] == version:
+                return cached[1]
+
+        # sort 是稳定排序，重要性相同的文章保持原有顺序
+        entries = [SortedEntry(-(article.get("importance", 0) or 0), article)
+                   for article in storage.iter_articles(site, date)]
+        entries.sort(key=lambda entry: entry.key)
+
+        if version is not None:
+            with self._lock:
+                if len(self._entries) >= self.max_entries:
+                    self._entries.pop(next(iter(self._entries)))
+                self._entries[key] = (version, entries)
+        return entries
+
+
+sorted_news_index = SortedNewsIndex()
+story_index = StoryIndex()
+
+# 返回故事信息时附加的字段
+CLUSTER_FIELDS = ("cluster_id", "cluster_size")
+
+
+def encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(str(offset).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> int:
+    if not cursor:
+        return 0
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        offset = int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except Exception:
+        raise QueryError("无效的cursor")
+    if offset < 0:
+        raise QueryError("无效的cursor")
+    return offset
+
+
+def parse_bool(value: Optional[str]) -> Optional[bool]:
+    if value is None or value == "":
+        return None
+    if value.lower() in ("1", "true", "yes"):
+        return True
+    if value.lower() in ("0", "false", "no"):
+        return False
+    raise QueryError(f"无效的布尔值: {value}")
+
+
+def parse_bound(value: Optional[str], name: str) -> Optional[float]:
+    if not value:
+        return None
+    timestamp = parse_time(value)
+    if timestamp is None:
+        raise QueryError(f"无效的时间: {name}={value}")
+    return timestamp
+
+
+class NewsQuery:
+    """一次新闻查询的参数
+
+    sites         站点显示名称列表，结果按站点顺序归并
+    sources       按来源过滤（不区分大小写）
+    url           只返回该URL的文章，用于列表不返回正文时单独获取正文
+    is_top_news   按是否头条过滤
+    since/until   发布时间范围（时间戳），无法解析发布时间的文章会被排除
+    fields        只返回指定字段，包含 cluster_id / cluster_size 时附加故事信息
+    dedupe        每个故事只返回最重要的一篇
+    limit/offset  分页
+    """
+
+    def __init__(self, sites: List[str], date: Optional[str] = None, sources: Iterable[str] = None,
+                 is_top_news: Optional[bool] = None, since: Optional[float] = None,
+                 until: Optional[float] = None, fields: Iterable[str] = None,
+                 dedupe: bool = False, limit: Optional[int] = None, offset: int = 0,
+                 url: Optional[str] = None):
+        self.sites = sites
+        self.date = date
+        self.sources = {source.lower() for source in sources} if sources else None
+        self.url = url
+        self.is_top_news = is_top_news
+        self.since = since
+        self.until = until
+        self.fields = list(fields) if fields else None
+        self.dedupe = dedupe
+        self.limit = limit
+        self.offset = offset
+
+    @classmethod
+    def from_args(cls, args, sites: List[str], max_limit: int = 500) -> "NewsQuery":
+        """从请求参数构建查询"""
+        limit = args.get("limit")
+        if limit is not None:
+            try:
+                limit = int(limit)
+            except ValueError:
+                raise QueryError(f"无效的limit: {limit}")
+            limit = max(1, min(limit, max_limit))
+
+        def split(value):
+            return [item.strip() for item in value.split(",") if item.strip()] if value else None
+
+        return cls(
+            sites=sites,
+            date=args.get("date") or None,
+            sources=split(args.get("source")),
+            is_top_news=parse_bool(args.get("is_top_news")),
+            since=parse_bound(args.get("since"), "since"),
+            until=parse_bound(args.get("until"), "until"),
+            fields=split(args.get("fields")),
+            dedupe=bool(parse_bool(args.get("dedupe"))),
+            limit=limit,
+            offset=decode_cursor(args.get("cursor")),
+            url=args.get("url") or None
+        )
+
+    def matches(self, entry: SortedEntry) -> bool:
+        article = entry.article
+        if self.url is not None and article.get("url") != self.url:
+            return False
+        if self.sources is not None and (article.get("source") or "").lower() not in self.sources:
+            return False
+        if self.is_top_news is not None and bool(article.get("is_top_news")) != self.is_top_news:
+            return False
+        if self.since is not None or self.until is not None:
+            if entry.published is None:
+                return False
+            if self.since is not None and entry.published < self.since:
+                return False
+            if self.until is not None and entry.published > self.until:
+                return False
+        return True
+
+    @property
+    def needs_clusters(self) -> bool:
+        """聚类需要读取所有站点的文章，只在去重或明确请求故事字段时进行"""
+        return self.dedupe or (self.fields is not None and any(field in CLUSTER_FIELDS for field in self.fields))
+
+    def project(self, entry: SortedEntry) -> Dict:
+        article = entry.article
+        if self.needs_clusters:
+            # 故事编号取决于同一天所有站点的文章，不写回缓存的文章
+            article = dict(article, cluster_id=entry.cluster_id, cluster_size=entry.cluster_size)
+        if self.fields is None:
+            # 签名只用于聚类，默认不返回
+            return {field: value for field, value in article.items() if field != "minhash"}
+        return {field: article[field] for field in self.fields if field in article}
+
+    def load_lists(self) -> List[List[SortedEntry]]:
+        """读取各站点的预排序列表，需要故事信息时对所有站点的文章聚类"""
+        sites = self.sites
+        if self.needs_clusters:
+            # 故事跨站点划分，只查询部分站点时也按全部站点聚类，保证故事编号一致
+            sites = list(dict.fromkeys(list(site_display_names().values()) + self.sites))
+        lists = {}
+        for site in sites:
+            try:
+                lists[site] = sorted_news_index.get(site, self.date)
+            except Exception as e:
+                print(f"读取 {site} 新闻失败: {str(e)}")
+        if self.needs_clusters:
+            story_index.assign(list(lists.values()), self.date)
+        return [lists[site] for site in self.sites if site in lists]
+
+    def iter_matches(self) -> Iterator[SortedEntry]:
+        # 各站点列表已按重要性排序，归并后整体有序；重要性相同时靠前站点的文章在前
+        merged = heapq.merge(*self.load_lists(), key=lambda entry: entry.key)
+        matches = (entry for entry in merged if self.matches(entry))
+        if self.dedupe:
+            matches = self.first_of_story(matches)
+        return matches
+
+    @staticmethod
+    def first_of_story(entries: Iterable[SortedEntry]) -> Iterator[SortedEntry]:
+        """每个故事只保留最先出现（最重要）的文章"""
+        seen = set()
+        for entry in entries:
+            if entry.cluster_id not in seen:
+                seen.add(entry.cluster_id)
+                yield entry
+
+    def execute(self) -> Dict:
+        """执行查询，返回当前页的新闻、匹配总数和下一页的cursor"""
+        matches = self.iter_matches()
+        skipped = sum(1 for _ in islice(matches, self.offset))
+        if self.limit is None:
+            page = [self.project(entry) for entry in matches]
+            return {"news": page, "total": skipped + len(page), "next_cursor": None}
+
+        page = [self.project(entry) for entry in islice(matches, self.limit)]
+        remaining = sum(1 for _ in matches)
+        end = self.offset + len(page)
+        return {
+            "news": page,
+            "total": skipped + len(page) + remaining,
+            "next_cursor": encode_cursor(end) if remaining else None
+        }
@@ -0,0 +1,68 @@
+"""
+已保存新闻的读取服务，按站点查找文件、日期和文章
+
+读取接口只需要站点配置和存储引擎，不创建爬虫对象，也不导入爬虫模块。
+"""
+import os
+import threading
+from typing import Dict, Iterator, List, Optional
+from ..config.config import NEWS_SITES
+from .article_store import get_article_store
+from .data_catalog import get_catalog, file_site_name
+from .storage import fill_source, get_storage
+
+
+class NewsReader:
+    """单个站点的新闻读取服务"""
+
+    def __init__(self, site_config: Dict):
+        self.site_config = site_config
+        self.name = site_config["name"]
+        self.file_name = file_site_name(self.name)
+
+    def latest_file(self) -> Optional[str]:
+        """最新的JSON文件路径"""
+        entry = get_catalog().latest(self.file_name)
+        return entry.path if entry else None
+
+    def file_by_date(self, date: str) -> Optional[str]:
+        """指定日期的JSON文件路径"""
+        entry = get_catalog().get(self.file_name, date)
+        return entry.path if entry else None
+
+    def dates(self) -> List[str]:
+        """可用日期列表（最新的在前）"""
+        return get_storage().dates(self.name)
+
+    def latest(self) -> Optional[Dict]:
+        """最新一天的概况: {"date", "count", "updated_at"}"""
+        return get_storage().latest(self.name)
+
+    def articles(self, date: Optional[str] = None) -> List[Dict]:
+        """读取指定日期的文章，date 为空时读取最新一天"""
+        return get_storage().load(self.name, date)
+
+    def iter_articles(self, date: Optional[str] = None) -> Iterator[Dict]:
+        return get_storage().iter_articles(self.name, date)
+
+    def articles_from_file(self, path: str) -> List[Dict]:
+        """读取指定JSON文件中的文章，文件不存在时返回空列表"""
+        if not path or not os.path.exists(path):
+            return []
+        # 返回新列表，调用方排序不会影响缓存
+        return list(fill_source(get_article_store().load(path), self.name))
+
+
+_readers: Dict[str, NewsReader] = {}
+_readers_lock = threading.Lock()
+
+
+def get_reader(site_id: str) -> NewsReader:
+    """获取站点的进程级读取服务"""
+    reader = _readers.get(site_id)
+    if reader is None:
+        with _readers_lock:
+            reader = _readers.get(site_id)
+            if reader is None:
+                reader = _readers[site_id] = NewsReader(NEWS_SITES[site_id])
+    return reader
@@ -0,0 +1,106 @@
+"""
+页面就绪检测，按内容选择器、DOM变更静默和按需滚动判断页面是否可以抓取
+"""
+import time
+from typing import Dict, Iterable, Optional
+from ..config.config import CRAWLER_CONFIG
+
+# 在页面中等待DOM变更静默：quiet_ms 内没有新的变更即视为静默，timeout_ms 后放弃等待
+DOM_QUIET_SCRIPT = """
+([quietMs, timeoutMs]) => new Promise(resolve => {
+    let quietTimer = null;
+    let hardTimer = null;
+    const observer = new MutationObserver(() => {
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(() => finish(true), quietMs);
+    });
+    const finish = (quiet) => {
+        observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(hardTimer);
+        resolve(quiet);
+    };
+    observer.observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+    quietTimer = setTimeout(() => finish(true), quietMs);
+    hardTimer = setTimeout(() => finish(false), timeoutMs);
+})
+"""
+
+SCROLL_SCRIPT = """
+() => {
+    window.scrollBy(0, window.innerHeight);
+    return window.innerHeight + window.scrollY >= document.body.scrollHeight;
+}
+"""
+
+
+class PageReadiness:
+    """页面就绪检测器
+
+    每一步等待的耗时都记录在 timings 中，便于评估各站点真实需要的等待时间。
+    """
+
+    def __init__(self, page, config: Dict = None):
+        self.page = page
+        self.config = config or CRAWLER_CONFIG.get("playwright", {}).get("readiness", {})
+        self.timings: Dict[str, float] = {}
+
+    def _record(self, name: str, started_at: float):
+        self.timings[name] = round(time.monotonic() - started_at, 3)
+
+    async def wait_for_any_selector(self, selectors: Iterable[str], timeout: Optional[int] = None) -> bool:
+        """等待任意一个选择器出现在DOM中"""
+        selector = ", ".join(s for s in selectors if s)
+        if not selector:
+            return False
+
+        timeout = timeout or CRAWLER_CONFIG.get("playwright", {}).get("ready_timeout", 10000)
+        started_at = time.monotonic()
+        try:
+            await self.page.wait_for_selector(selector, state="attached", timeout=timeout)
+            return True
+        except Exception as e:
+            print(f"等待内容选择器超时，使用当前页面内容: {selector} - {str(e)}")
+            return False
+        finally:
+            self._record("selector", started_at)
+
+    async def wait_for_dom_quiet(self, quiet_ms: Optional[int] = None, timeout: Optional[int] = None,
+                                 name: str = "dom_quiet") -> bool:
+        """等待DOM变更静默，返回是否在超时前静默"""
+        quiet_ms = quiet_ms or self.config.get("dom_quiet_ms", 500)
+        timeout = timeout or self.config.get("dom_quiet_timeout", 5000)
+        started_at = time.monotonic()
+        try:
+            return await self.page.evaluate(DOM_QUIET_SCRIPT, [quiet_ms, timeout])
+        except Exception as e:
+            print(f"等待DOM静默失败: {str(e)}")
+            return False
+        finally:
+            self._record(name, started_at)
+
+    async def count(self, selector: str) -> int:
+        try:
+            return await self.page.locator(selector).count()
+        except Exception:
+            return 0
+
+    async def scroll_until_count(self, selector: str, target: int, max_scrolls: Optional[int] = None) -> int:
+        """按需滚动以触发懒加载，直到匹配元素数量达到 target、到达页面底部或超过滚动次数上限"""
+        max_scrolls = max_scrolls if max_scrolls is not None else self.config.get("max_scrolls", 5)
+        started_at = time.monotonic()
+        count = await self.count(selector)
+        scrolls = 0
+        while count < target and scrolls < max_scrolls:
+            at_bottom = await self.page.evaluate(SCROLL_SCRIPT)
+            scrolls += 1
+            await self.wait_for_dom_quiet(quiet_ms=self.config.get("scroll_quiet_ms", 300), name="scroll_quiet")
+            new_count = await self.count(selector)
+            if at_bottom and new_count == count:
+                break
+            count = new_count
+
+        self._record("scroll", started_at)
+        self.timings["scrolls"] = scrolls
+        self.timings["items"] = count
+        return count
@@ -1,10 +1,10 @@
 """
 代理管理器类，用于管理和验证代理服务器
 """
-import aiohttp
 import asyncio
 from typing import List, Set
 from ..config.config import CRAWLER_CONFIG
+from .http_client import get_http_client
 
 class ProxyManager:
     def __init__(self):
@@ -18,15 +18,14 @@ class ProxyManager:
     async def test_proxy(self, proxy: str) -> bool:
         """测试代理是否可用"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    self.test_url,
-                    proxy=proxy,
-                    headers=self.headers,
-                    timeout=self.timeout,
-                    ssl=False
-                ) as response:
-                    return response.status == 200
+            response = await get_http_client().get(
+                self.test_url,
+                proxy=proxy,
+                headers=self.headers,
+                timeout=self.timeout,
+                ssl=False
+            )
+            return response.status == 200
         except Exception:
             return False
     
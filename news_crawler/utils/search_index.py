@@ -0,0 +1,296 @@
+"""
+全文搜索索引，基于SQLite FTS5对文章的标题、摘要和正文建立倒排索引
+
+save_to_json 保存文章后调用 index() 增量更新，同一站点同一天的同一URL只保留一条记录。
+搜索按BM25排序并返回高亮的摘录，只对最新的 max_candidates 条匹配结果排序，
+查询耗时不会随保存的历史天数增长。
+
+为已有数据建立索引:
+    python -m news_crawler.utils.search_index rebuild
+"""
+import argparse
+import html
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional
+from ..config.config import CRAWLER_CONFIG
+from .data_catalog import DATA_DIR, file_site_name
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    site TEXT NOT NULL,
+    crawl_date TEXT NOT NULL,
+    url TEXT NOT NULL,
+    source TEXT,
+    publish_time TEXT,
+    importance REAL NOT NULL DEFAULT 0,
+    is_top_news INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (site, crawl_date, url)
+);
+CREATE INDEX IF NOT EXISTS idx_documents_date ON documents (crawl_date);
+-- prefix 为3和4个字符的前缀建立额外索引，前缀查询不需要逐个展开词项
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    title, summary, content, tokenize = 'porter unicode61 remove_diacritics 2', prefix = '3 4'
+);
+"""
+
+# 标题、摘要、正文在BM25中的权重
+COLUMN_WEIGHTS = (10.0, 4.0, 1.0)
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+# FTS5先用私有区字符标记命中的词，转义HTML后再替换为 <mark> 标签，避免文章中的HTML原样返回
+START_SENTINEL = "\ue000"
+END_SENTINEL = "\ue001"
+
+TERM_PATTERN = re.compile(r'"([^"]+)"|(\w+\*?)', re.UNICODE)
+# 前缀匹配的最短长度，更短的前缀会展开成大量词项，按完整的词匹配
+MIN_PREFIX_LENGTH = 3
+
+
+class SearchError(ValueError):
+    """搜索参数错误"""
+
+
+def render_highlight(text: Optional[str]) -> str:
+    """转义文章文本中的HTML，只保留命中词的 <mark> 标签"""
+    return (html.escape(text or "")
+            .replace(START_SENTINEL, HIGHLIGHT_START)
+            .replace(END_SENTINEL, HIGHLIGHT_END))
+
+
+def build_match(query: str) -> str:
+    """将用户输入转换为FTS5查询
+
+    所有词都必须出现；双引号括起的内容按短语匹配，以 * 结尾且不少于 MIN_PREFIX_LENGTH 个字符的词按前缀匹配。
+    用户输入中的FTS5运算符（AND、OR、NEAR、列过滤等）按普通词处理。
+    """
+    terms = []
+    for phrase, word in TERM_PATTERN.findall(query or ""):
+        if phrase:
+            words = re.findall(r"\w+", phrase, re.UNICODE)
+            if words:
+                terms.append('"' + " ".join(words) + '"')
+        elif word.endswith("*") and len(word) > MIN_PREFIX_LENGTH:
+            terms.append(f'"{word[:-1]}"*')
+        elif word.endswith("*"):
+            terms.append(f'"{word[:-1]}"')
+        else:
+            terms.append(f'"{word}"')
+    if not terms:
+        raise SearchError("搜索词不能为空")
+    return " ".join(terms)
+
+
+class SearchIndex:
+    """SQLite FTS5全文索引，每个线程使用独立的连接"""
+
+    def __init__(self, path: str = None, max_candidates: int = None, snippet_tokens: int = None):
+        config = CRAWLER_CONFIG.get("search", {})
+        self.path = path or config.get("path") or os.path.join(DATA_DIR, "search.db")
+        self.max_candidates = max_candidates or config.get("max_candidates", 2000)
+        self.snippet_tokens = snippet_tokens or config.get("snippet_tokens", 24)
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        # 多个站点可能同时在线程池中建立索引，写入串行执行，避免先查询后插入的竞争
+        self._write_lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def index(self, site: str, articles: Iterable[Dict], date: str) -> int:
+        """索引站点某一天的文章，已索引的URL更新为最新内容，返回索引的文章数"""
+        site_key = file_site_name(site)
+        connection = self._connection()
+        count = 0
+        with self._write_lock, connection:
+            for article in articles:
+                url = article.get("url") or f"title:{article.get('title', '')}"
+                row = connection.execute(
+                    "SELECT id FROM documents WHERE site = ? AND crawl_date = ? AND url = ?",
+                    (site_key, date, url)
+                ).fetchone()
+                values = (article.get("source") or site, article.get("publish_time", ""),
+                          article.get("importance", 0) or 0, 1 if article.get("is_top_news") else 0)
+                if row is None:
+                    doc_id = connection.execute(
+                        "INSERT INTO documents (site, crawl_date, url, source, publish_time, importance, is_top_news) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (site_key, date, url) + values
+                    ).lastrowid
+                else:
+                    doc_id = row[0]
+                    connection.execute(
+                        "UPDATE documents SET source = ?, publish_time = ?, importance = ?, is_top_news = ? WHERE id = ?",
+                        values + (doc_id,)
+                    )
+                    connection.execute("DELETE FROM documents_fts WHERE rowid = ?", (doc_id,))
+                # 正文回退为摘要时不重复索引
+                summary = article.get("summary") or ""
+                content = article.get("content") or ""
+                connection.execute(
+                    "INSERT INTO documents_fts (rowid, title, summary, content) VALUES (?, ?, ?, ?)",
+                    (doc_id, article.get("title") or "", summary, "" if content == summary else content)
+                )
+                count += 1
+        return count
+
+    def search(self, query: str, sites: Optional[List[str]] = None, sources: Optional[Iterable[str]] = None,
+               start: Optional[str] = None, end: Optional[str] = None,
+               limit: int = 20, offset: int = 0) -> Dict:
+        """搜索文章，返回当前页的结果和是否还有下一页
+
+        sites 为站点显示名称，sources 按来源过滤（不区分大小写），start/end 为爬取日期范围（YYYYMMDD，包含两端）。
+        先按写入顺序取最新的 max_candidates 条匹配结果，再按BM25排序分页。
+        """
+        conditions, params = ["documents_fts MATCH ?"], [build_match(query)]
+        if sites:
+            conditions.append(f"d.site IN ({', '.join('?' for _ in sites)})")
+            params.extend(file_site_name(site) for site in sites)
+        if sources:
+            sources = [source.lower() for source in sources]
+            conditions.append(f"LOWER(d.source) IN ({', '.join('?' for _ in sources)})")
+            params.extend(sources)
+        if start:
+            conditions.append("d.crawl_date >= ?")
+            params.append(start)
+        if end:
+            conditions.append("d.crawl_date <= ?")
+            params.append(end)
+
+        match = params[0]
+        connection = self._connection()
+        # 先在最新的候选结果中按BM25排序取出当前页，只为当前页生成摘录
+        ranked = connection.execute(
+            f"""
+            SELECT id, score FROM (
+                SELECT d.id, bm25(documents_fts, ?, ?, ?) AS score
+                FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid
+                WHERE {' AND '.join(conditions)}
+                ORDER BY documents_fts.rowid DESC
+                LIMIT ?
+            )
+            ORDER BY score, id DESC
+            LIMIT ? OFFSET ?
+            """,
+            [*COLUMN_WEIGHTS, *params, self.max_candidates, limit + 1, offset]
+        ).fetchall()
+        page = ranked[:limit]
+        if not page:
+            return {"results": [], "has_more": False}
+
+        ids = [doc_id for doc_id, _ in page]
+        marks = (START_SENTINEL, END_SENTINEL, "…", self.snippet_tokens)
+        rows = connection.execute(
+            f"""
+            SELECT d.id, d.site, d.crawl_date, d.url, d.source, d.publish_time, d.importance, d.is_top_news,
+                   highlight(documents_fts, 0, ?, ?), snippet(documents_fts, 1, ?, ?, ?, ?),
+                   snippet(documents_fts, 2, ?, ?, ?, ?)
+            FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid
+            WHERE documents_fts MATCH ? AND documents_fts.rowid IN ({', '.join('?' for _ in ids)})
+            """,
+            [START_SENTINEL, END_SENTINEL, *marks, *marks, match, *ids]
+        ).fetchall()
+        by_id = {row[0]: row[1:] for row in rows}
+
+        results = []
+        for doc_id, score in page:
+            if doc_id not in by_id:
+                continue
+            _, date, url, source, publish_time, importance, is_top_news, title, summary, content = by_id[doc_id]
+            results.append({
+                "title": render_highlight(title),
+                "url": url,
+                "source": source,
+                "date": date,
+                "publish_time": publish_time,
+                "importance": importance,
+                "is_top_news": bool(is_top_news),
+                # 优先使用正文中的摘录，正文没有命中时使用摘要
+                "snippet": render_highlight(content if START_SENTINEL in (content or "") else summary),
+                # bm25() 越小越相关，取反后越大越相关
+                "score": round(-score, 4)
+            })
+        return {"results": results, "has_more": len(ranked) > limit}
+
+    def clear(self):
+        connection = self._connection()
+        with connection:
+            connection.execute("DELETE FROM documents")
+            connection.execute("DELETE FROM documents_fts")
+
+    def close(self):
+        with self._lock:
+            for connection in self._connections:
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+            self._connections.clear()
+        self._local = threading.local()
+
+
+_search_index: Optional[SearchIndex] = None
+_search_index_lock = threading.Lock()
+
+
+def get_search_index() -> Optional[SearchIndex]:
+    """获取进程级搜索索引，配置中禁用时返回 None"""
+    global _search_index
+    if not CRAWLER_CONFIG.get("search", {}).get("enabled", True):
+        return None
+    if _search_index is None:
+        with _search_index_lock:
+            if _search_index is None:
+                _search_index = SearchIndex()
+    return _search_index
+
+
+def rebuild(index: SearchIndex) -> Dict[str, int]:
+    """清空索引并从存储引擎中重新索引所有站点所有日期的文章"""
+    from .storage import get_storage, site_display_names
+
+    storage = get_storage()
+    index.clear()
+    result = {"days": 0, "articles": 0, "failed": 0}
+    for site in site_display_names().values():
+        for date in storage.dates(site):
+            try:
+                result["articles"] += index.index(site, storage.iter_articles(site, date), date)
+                result["days"] += 1
+            except Exception as e:
+                result["failed"] += 1
+                print(f"索引 {site} {date} 失败: {str(e)}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="全文搜索索引管理")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    rebuild_parser = subparsers.add_parser("rebuild", help="从存储引擎中的已有文章重建索引")
+    rebuild_parser.add_argument("--path", default=None, help="索引数据库路径，默认使用配置中的search.path")
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        index = SearchIndex(path=args.path)
+        result = rebuild(index)
+        index.close()
+        print(f"重建完成: {result['days']} 个站点日期, {result['articles']} 篇文章, {result['failed']} 个失败")
+
+
+if __name__ == "__main__":
+    main()
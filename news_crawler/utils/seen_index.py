@@ -0,0 +1,144 @@
+"""
+已抓取文章索引，按URL记录最近几天保存过的文章，爬取时复用已有的正文
+
+索引在首次查询某个站点时从存储中加载最近 lookback_days 天的文章，
+之后由 save_to_json 保存文章时增量更新。正文抓取时间超过 ttl_hours 的文章会重新抓取。
+正文抓取时间记录在 content_fetched_at 字段中，只在实际抓取正文时设置，复用的文章沿用原来的时间；
+部分站点在提取列表时就设置 crawl_time，不能用它判断正文是否过期（旧数据没有该字段时才回退到 crawl_time）。
+"""
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from ..config.config import CRAWLER_CONFIG
+from .data_catalog import file_site_name
+from .storage import get_storage
+
+# 列表页预填的预览占位和抓取失败时各爬虫写入的占位正文，不能复用
+PLACEHOLDER_CONTENTS = {
+    "文章预览暂无，请点击原文阅读。",
+    "无法获取文章内容，请访问原文阅读。",
+    "获取内容时出错，请访问原文阅读。",
+    "无法获取文章内容，可能需要订阅或登录才能访问。",
+    "获取内容时出错，请点击原文阅读。",
+    "无法获取文章内容，请稍后再试。",
+    "无法获取文章内容，可能是测试数据或未发布的文章。",
+    "无法提取文章内容，请访问原文阅读完整内容。",
+    "无法提取文章内容，可能需要订阅或登录才能访问。纽约时报的大多数文章需要订阅才能阅读完整内容。",
+    "无法提取文章内容，可能需要订阅或登录才能访问。华盛顿邮报的大多数文章需要订阅才能阅读完整内容。",
+}
+
+# 由正文抓取得到的字段，复用时以已保存的值为准（列表页可能预填了摘要或占位正文）
+FETCHED_FIELDS = ("content", "summary", "publish_time")
+
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def parse_crawl_time(article: Dict, fallback: Optional[datetime] = None) -> Optional[datetime]:
+    """正文抓取时间，优先使用 content_fetched_at，旧数据回退到 crawl_time"""
+    for field in ("content_fetched_at", "crawl_time"):
+        value = article.get(field)
+        if value:
+            try:
+                return datetime.strptime(value[:19], TIME_FORMAT)
+            except ValueError:
+                pass
+    return fallback
+
+
+def mark_fetched(article: Dict, fetched_at: Optional[datetime] = None):
+    """记录文章正文的抓取时间"""
+    article["content_fetched_at"] = (fetched_at or datetime.now()).strftime(TIME_FORMAT)
+
+
+def has_reusable_content(article: Dict) -> bool:
+    """正文非空，且不是占位文本或摘要回退"""
+    content = (article.get("content") or "").strip()
+    if not content or content in PLACEHOLDER_CONTENTS:
+        return False
+    return content != (article.get("summary") or "").strip()
+
+
+class SeenArticleIndex:
+    """URL到已保存文章的索引，每个站点独立加载"""
+
+    def __init__(self, config: Dict = None):
+        config = config or CRAWLER_CONFIG.get("incremental", {})
+        self.lookback_days = config.get("lookback_days", 2)
+        self.ttl = timedelta(hours=config.get("ttl_hours", 24))
+        # 站点文件名 -> {URL: (文章, 正文抓取时间)}
+        self._sites: Dict[str, Dict[str, tuple]] = {}
+        self._lock = threading.Lock()
+
+    def _load_site(self, site: str) -> Dict[str, tuple]:
+        key = file_site_name(site)
+        with self._lock:
+            entries = self._sites.get(key)
+            if entries is not None:
+                return entries
+
+        entries = {}
+        storage = get_storage()
+        oldest = (datetime.now() - timedelta(days=self.lookback_days - 1)).strftime("%Y%m%d")
+        # 从早到晚加载，同一URL以较新的一天为准
+        for date in sorted(d for d in storage.dates(site) if d >= oldest):
+            fallback = datetime.strptime(date, "%Y%m%d")
+            try:
+                for article in storage.iter_articles(site, date):
+                    if article.get("url") and has_reusable_content(article):
+                        entries[article["url"]] = (article, parse_crawl_time(article, fallback))
+            except Exception as e:
+                print(f"加载 {site} {date} 的已抓取文章失败: {str(e)}")
+
+        with self._lock:
+            return self._sites.setdefault(key, entries)
+
+    def lookup(self, site: str, url: str) -> Optional[tuple]:
+        """返回可以复用的 (已保存文章, 正文抓取时间)，不存在或已过期时返回 None"""
+        entry = self._load_site(site).get(url)
+        if entry is None:
+            return None
+        fetched_at = entry[1]
+        if fetched_at is None or datetime.now() - fetched_at > self.ttl:
+            return None
+        return entry
+
+    def reuse(self, site: str, article: Dict) -> bool:
+        """用已保存的正文和元数据补全文章，成功时返回 True
+
+        正文、摘要、发布时间等 FETCHED_FIELDS 字段使用已保存的值，覆盖列表页预填的摘要或占位正文；
+        其他非空字段（标题、重要性、是否头条等）保持本次爬取的值，只补全空缺的字段。
+        正文抓取时间沿用已保存的时间，过期判断不会因为文章再次出现在列表中而推迟。
+        """
+        entry = self.lookup(site, article.get("url", ""))
+        if entry is None:
+            return False
+        saved, fetched_at = entry
+        for key, value in saved.items():
+            if not article.get(key) or (key in FETCHED_FIELDS and value):
+                article[key] = value
+        mark_fetched(article, fetched_at)
+        return True
+
+    def record(self, site: str, articles):
+        """记录刚保存的文章"""
+        now = datetime.now()
+        entries = self._load_site(site)
+        with self._lock:
+            for article in articles:
+                if article.get("url") and has_reusable_content(article):
+                    entries[article["url"]] = (article, parse_crawl_time(article, now))
+
+    def clear(self):
+        with self._lock:
+            self._sites.clear()
+
+
+seen_index = SeenArticleIndex()
+
+
+def get_seen_index() -> Optional[SeenArticleIndex]:
+    """获取进程级已抓取文章索引，配置中禁用增量爬取时返回 None"""
+    if not CRAWLER_CONFIG.get("incremental", {}).get("enabled", True):
+        return None
+    return seen_index
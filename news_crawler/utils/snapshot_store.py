@@ -0,0 +1,82 @@
+"""
+原始HTML快照存储
+
+文章卡片的原始HTML按内容的SHA-256哈希压缩保存在独立目录中，文章记录只保留哈希引用
+（"snapshot" 字段），读取文章时不需要加载这些HTML。
+"""
+import gzip
+import hashlib
+import os
+import re
+import threading
+from typing import Dict, Optional
+from ..config.config import CRAWLER_CONFIG
+from .data_catalog import DATA_DIR
+
+HASH_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+class SnapshotStore:
+    """内容寻址的快照存储，路径格式: {root}/{hash[:2]}/{hash}.html.gz
+
+    相同内容只保存一次；写入先写临时文件再原子替换，读取方不会看到写了一半的文件。
+    """
+
+    def __init__(self, root: str = None, compress_level: int = None):
+        config = CRAWLER_CONFIG.get("snapshots", {})
+        self.root = root or config.get("path") or os.path.join(DATA_DIR, "snapshots")
+        self.compress_level = compress_level if compress_level is not None else config.get("compress_level", 6)
+
+    def path_for(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], f"{digest}.html.gz")
+
+    def put(self, html: str) -> str:
+        """保存HTML，返回内容哈希"""
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest)
+        if os.path.exists(path):
+            return digest
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        # mtime=0 使相同内容的压缩结果完全一致
+        with open(tmp_path, "wb") as f:
+            f.write(gzip.compress(data, compresslevel=self.compress_level, mtime=0))
+        os.replace(tmp_path, path)
+        return digest
+
+    def get_compressed(self, digest: str) -> Optional[bytes]:
+        """读取gzip压缩的快照，哈希无效或不存在时返回 None"""
+        if not HASH_PATTERN.match(digest or ""):
+            return None
+        try:
+            with open(self.path_for(digest), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def get(self, digest: str) -> Optional[str]:
+        data = self.get_compressed(digest)
+        return gzip.decompress(data).decode("utf-8") if data is not None else None
+
+    def externalize(self, article: Dict) -> Dict:
+        """将文章中的 element_html 移到快照存储，替换为 snapshot 哈希引用"""
+        html = article.pop("element_html", None)
+        if html:
+            article["snapshot"] = self.put(html)
+        return article
+
+
+snapshot_store = None
+_snapshot_store_lock = threading.Lock()
+
+
+def get_snapshot_store() -> SnapshotStore:
+    """获取进程级快照存储"""
+    global snapshot_store
+    if snapshot_store is None:
+        with _snapshot_store_lock:
+            if snapshot_store is None:
+                snapshot_store = SnapshotStore()
+    return snapshot_store
@@ -0,0 +1,468 @@
+"""
+文章存储引擎，支持按站点和日期保存、读取文章
+
+json    每个站点每天一个JSON文件（默认，与旧版本的数据目录兼容）
+jsonl   每个站点每天一个只追加的JSONL文件，文章正文抓取完成后立即写入
+sqlite  嵌入式SQLite数据库（WAL模式），同一天多次爬取的结果按URL合并
+
+迁移已有的JSON文件到SQLite:
+    python -m news_crawler.utils.storage migrate [--data-dir DIR] [--db-path PATH]
+"""
+import argparse
+import atexit
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+from ..config.config import CRAWLER_CONFIG, NEWS_SITES
+from .article_store import get_article_store
+from .data_catalog import DATA_DIR, FILE_PATTERN, DataCatalog, get_catalog, file_site_name
+from .crawl_log import JsonlWriter, count_jsonl, iter_jsonl
+from .snapshot_store import get_snapshot_store
+from .story_clusters import sign_articles
+
+
+class StorageEngine:
+    """存储引擎接口
+
+    site 为站点显示名称（如 "BBC News"），date 为 YYYYMMDD 格式的爬取日期。
+    """
+
+    name = ""
+    # 是否支持在爬取过程中逐篇写入
+    streaming = False
+
+    def append(self, site: str, article: Dict):
+        """写入单篇文章，仅流式引擎支持"""
+
+    def save(self, site: str, articles: List[Dict], date: Optional[str] = None) -> Optional[str]:
+        """保存文章，返回保存位置"""
+        raise NotImplementedError
+
+    def load(self, site: str, date: Optional[str] = None) -> List[Dict]:
+        """读取站点指定日期的文章，date 为空时读取最新一天"""
+        raise NotImplementedError
+
+    def iter_articles(self, site: str, date: Optional[str] = None) -> Iterator[Dict]:
+        """逐篇读取文章，流式引擎不会一次性加载整个文件"""
+        return iter(self.load(site, date))
+
+    def dates(self, site: Optional[str] = None) -> List[str]:
+        """可用日期列表（最新的在前），site 为空时返回所有站点的日期"""
+        raise NotImplementedError
+
+    def latest(self, site: str) -> Optional[Dict]:
+        """站点最新一天的概况: {"date", "count", "updated_at"}"""
+        raise NotImplementedError
+
+    def version(self, site: str, date: Optional[str] = None):
+        """站点指定日期数据的版本标识，数据变化后标识随之变化，用于读取方缓存"""
+        return None
+
+    def close(self):
+        pass
+
+
+def fill_source(articles: List[Dict], site: str) -> List[Dict]:
+    """为缺少来源的文章补充站点名称，并去掉旧数据中内联的 element_html"""
+    for article in articles:
+        if not article.get('source'):
+            article['source'] = site
+        article.pop('element_html', None)
+    return articles
+
+
+def fill_source_iter(articles: Iterable[Dict], site: str) -> Iterator[Dict]:
+    for article in articles:
+        if not article.get('source'):
+            article['source'] = site
+        article.pop('element_html', None)
+        yield article
+
+
+def externalize_snapshots(articles: Iterable[Dict]) -> None:
+    """写入前将文章的原始HTML移到快照存储，文章记录只保留哈希引用"""
+    store = get_snapshot_store()
+    for article in articles:
+        store.externalize(article)
+
+
+def prepare_articles(articles: List[Dict]) -> None:
+    """写入前的预处理: 外置原始HTML，并计算用于故事聚类的MinHash签名"""
+    externalize_snapshots(articles)
+    sign_articles(articles)
+
+
+class JsonStorage(StorageEngine):
+    """JSON文件存储，同一天再次保存会覆盖当天的文件"""
+
+    name = "json"
+
+    def __init__(self, data_dir: str = DATA_DIR):
+        self.data_dir = data_dir
+
+    def path_for(self, site: str, date: str) -> str:
+        return os.path.join(self.data_dir, f"@{file_site_name(site)}_{date}.json")
+
+    def save(self, site: str, articles: List[Dict], date: Optional[str] = None) -> Optional[str]:
+        os.makedirs(self.data_dir, exist_ok=True)
+        filepath = self.path_for(site, date or datetime.now().strftime('%Y%m%d'))
+        prepare_articles(articles)
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(articles, f, ensure_ascii=False, indent=2)
+        get_article_store().invalidate(filepath)
+        get_catalog().record(filepath, count=len(articles))
+        return filepath
+
+    def load(self, site: str, date: Optional[str] = None) -> List[Dict]:
+        catalog = get_catalog()
+        key = file_site_name(site)
+        entry = catalog.get(key, date) if date else catalog.latest(key)
+        if not entry:
+            return []
+        # 返回新列表，调用方排序不会影响缓存
+        return list(fill_source(get_article_store().load(entry.path), site))
+
+    def dates(self, site: Optional[str] = None) -> List[str]:
+        return get_catalog().dates(file_site_name(site) if site else None)
+
+    def latest(self, site: str) -> Optional[Dict]:
+        entry = get_catalog().latest(file_site_name(site))
+        if not entry:
+            return None
+        return {
+            "date": entry.date,
+            "count": entry.count,
+            "updated_at": datetime.fromtimestamp(entry.mtime).isoformat()
+        }
+
+    def version(self, site: str, date: Optional[str] = None):
+        key = file_site_name(site)
+        entry = get_catalog().get(key, date) if date else get_catalog().latest(key)
+        return (entry.path, entry.mtime, entry.size) if entry else None
+
+
+class JsonlStorage(StorageEngine):
+    """只追加的JSONL存储
+
+    爬取过程中每篇文章抓取完正文后立即追加一行，爬取结束时只补写尚未写入的文章，
+    进程中途退出时已抓取的文章不会丢失。文件按站点和日期轮换，同一URL以最后一行为准。
+    """
+
+    name = "jsonl"
+    streaming = True
+
+    def __init__(self, data_dir: str = DATA_DIR, fsync_every: int = None, fsync_interval: float = None):
+        config = CRAWLER_CONFIG.get("storage", {}).get("jsonl", {})
+        self.data_dir = data_dir
+        self.fsync_every = fsync_every or config.get("fsync_every", 20)
+        self.fsync_interval = fsync_interval or config.get("fsync_interval", 5)
+        self.catalog = DataCatalog(data_dir, extension=".jsonl", counter=count_jsonl)
+        self._writers: Dict[str, JsonlWriter] = {}
+        self._lock = threading.Lock()
+
+    def path_for(self, site: str, date: str) -> str:
+        return os.path.join(self.data_dir, f"@{file_site_name(site)}_{date}.jsonl")
+
+    def _writer(self, site: str, date: Optional[str] = None) -> JsonlWriter:
+        """获取站点当天的写入器，日期变化时轮换到新文件"""
+        path = self.path_for(site, date or datetime.now().strftime('%Y%m%d'))
+        key = file_site_name(site)
+        with self._lock:
+            writer = self._writers.get(key)
+            if writer is None or writer.path != path:
+                if writer is not None:
+                    writer.close()
+                os.makedirs(self.data_dir, exist_ok=True)
+                writer = self._writers[key] = JsonlWriter(path, self.fsync_every, self.fsync_interval)
+            return writer
+
+    def append(self, site: str, article: Dict):
+        writer = self._writer(site)
+        prepare_articles([article])
+        writer.write(article)
+        self.catalog.record(writer.path)
+
+    def save(self, site: str, articles: List[Dict], date: Optional[str] = None) -> Optional[str]:
+        writer = self._writer(site, date)
+        prepare_articles(articles)
+        for article in articles:
+            # 爬取过程中写入后又更新过的文章（重要性、排序等）或同一天重新爬取的文章追加最终记录，
+            # 读取时同一URL以最后一行为准；与最后写入的记录完全相同时不重复写入
+            if not writer.is_current(article):
+                writer.write(article)
+        writer.sync()
+        self.catalog.record(writer.path)
+        return writer.path
+
+    def iter_articles(self, site: str, date: Optional[str] = None) -> Iterator[Dict]:
+        key = file_site_name(site)
+        entry = self.catalog.get(key, date) if date else self.catalog.latest(key)
+        if not entry:
+            return iter(())
+        return fill_source_iter(iter_jsonl(entry.path), site)
+
+    def load(self, site: str, date: Optional[str] = None) -> List[Dict]:
+        return list(self.iter_articles(site, date))
+
+    def dates(self, site: Optional[str] = None) -> List[str]:
+        return self.catalog.dates(file_site_name(site) if site else None)
+
+    def latest(self, site: str) -> Optional[Dict]:
+        entry = self.catalog.latest(file_site_name(site))
+        if not entry:
+            return None
+        return {
+            "date": entry.date,
+            "count": entry.count,
+            "updated_at": datetime.fromtimestamp(entry.mtime).isoformat()
+        }
+
+    def version(self, site: str, date: Optional[str] = None):
+        key = file_site_name(site)
+        entry = self.catalog.get(key, date) if date else self.catalog.latest(key)
+        return (entry.path, entry.mtime, entry.size) if entry else None
+
+    def close(self):
+        with self._lock:
+            for writer in self._writers.values():
+                writer.close()
+            self._writers.clear()
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    site TEXT NOT NULL,
+    crawl_date TEXT NOT NULL,
+    url TEXT NOT NULL,
+    title TEXT,
+    source TEXT,
+    importance REAL NOT NULL DEFAULT 0,
+    is_top_news INTEGER NOT NULL DEFAULT 0,
+    publish_time TEXT,
+    crawl_time TEXT,
+    data TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    UNIQUE (site, crawl_date, url)
+);
+CREATE INDEX IF NOT EXISTS idx_articles_site_date ON articles (site, crawl_date);
+CREATE INDEX IF NOT EXISTS idx_articles_date ON articles (crawl_date);
+CREATE INDEX IF NOT EXISTS idx_articles_url ON articles (url);
+CREATE INDEX IF NOT EXISTS idx_articles_importance ON articles (site, crawl_date, importance DESC);
+"""
+
+UPSERT_SQL = """
+INSERT INTO articles (site, crawl_date, url, title, source, importance, is_top_news,
+                      publish_time, crawl_time, data, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (site, crawl_date, url) DO UPDATE SET
+    title = excluded.title,
+    source = excluded.source,
+    importance = excluded.importance,
+    is_top_news = excluded.is_top_news,
+    publish_time = excluded.publish_time,
+    crawl_time = excluded.crawl_time,
+    data = excluded.data,
+    updated_at = excluded.updated_at
+"""
+
+
+class SqliteStorage(StorageEngine):
+    """SQLite存储
+
+    每个线程使用独立的连接，数据库开启WAL模式，读请求不会被爬虫写入阻塞。
+    文章按 (站点, 日期, URL) 去重，同一天多次爬取的结果会合并而不是覆盖。
+    """
+
+    name = "sqlite"
+
+    def __init__(self, db_path: str = None, batch_size: int = None):
+        config = CRAWLER_CONFIG.get("storage", {})
+        self.db_path = db_path or config.get("db_path") or os.path.join(DATA_DIR, "news.db")
+        self.batch_size = batch_size or config.get("batch_size", 500)
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(self.db_path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    @staticmethod
+    def _row(site_key: str, date: str, article: Dict, now: str):
+        # 没有URL的文章按标题去重
+        url = article.get("url") or f"title:{article.get('title', '')}"
+        return (
+            site_key, date, url, article.get("title", ""), article.get("source", ""),
+            article.get("importance", 0) or 0, 1 if article.get("is_top_news") else 0,
+            article.get("publish_time", ""), article.get("crawl_time", ""),
+            json.dumps(article, ensure_ascii=False), now
+        )
+
+    def save(self, site: str, articles: List[Dict], date: Optional[str] = None) -> Optional[str]:
+        site_key = file_site_name(site)
+        date = date or datetime.now().strftime('%Y%m%d')
+        now = datetime.now().isoformat()
+        prepare_articles(articles)
+        connection = self._connection()
+        # 分批写入，每批一个事务
+        for start in range(0, len(articles), self.batch_size):
+            batch = articles[start:start + self.batch_size]
+            with connection:
+                connection.executemany(UPSERT_SQL, [self._row(site_key, date, article, now) for article in batch])
+        return f"{self.db_path}#{site_key}/{date}"
+
+    def _latest_date(self, site_key: str) -> Optional[str]:
+        row = self._connection().execute(
+            "SELECT MAX(crawl_date) FROM articles WHERE site = ?", (site_key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def load(self, site: str, date: Optional[str] = None) -> List[Dict]:
+        site_key = file_site_name(site)
+        date = date or self._latest_date(site_key)
+        if not date:
+            return []
+        rows = self._connection().execute(
+            "SELECT data FROM articles WHERE site = ? AND crawl_date = ? ORDER BY importance DESC, id",
+            (site_key, date)
+        ).fetchall()
+        return fill_source([json.loads(row[0]) for row in rows], site)
+
+    def dates(self, site: Optional[str] = None) -> List[str]:
+        if site:
+            rows = self._connection().execute(
+                "SELECT DISTINCT crawl_date FROM articles WHERE site = ? ORDER BY crawl_date DESC",
+                (file_site_name(site),)
+            ).fetchall()
+        else:
+            rows = self._connection().execute(
+                "SELECT DISTINCT crawl_date FROM articles ORDER BY crawl_date DESC"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def latest(self, site: str) -> Optional[Dict]:
+        site_key = file_site_name(site)
+        date = self._latest_date(site_key)
+        if not date:
+            return None
+        count, updated_at = self._connection().execute(
+            "SELECT COUNT(*), MAX(updated_at) FROM articles WHERE site = ? AND crawl_date = ?",
+            (site_key, date)
+        ).fetchone()
+        return {"date": date, "count": count, "updated_at": updated_at}
+
+    def version(self, site: str, date: Optional[str] = None):
+        site_key = file_site_name(site)
+        date = date or self._latest_date(site_key)
+        if not date:
+            return None
+        count, updated_at = self._connection().execute(
+            "SELECT COUNT(*), MAX(updated_at) FROM articles WHERE site = ? AND crawl_date = ?",
+            (site_key, date)
+        ).fetchone()
+        return (date, count, updated_at)
+
+    def close(self):
+        with self._lock:
+            for connection in self._connections:
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+            self._connections.clear()
+        self._local = threading.local()
+
+
+ENGINES = {
+    "json": JsonStorage,
+    "jsonl": JsonlStorage,
+    "sqlite": SqliteStorage
+}
+
+_storage: Optional[StorageEngine] = None
+_storage_lock = threading.Lock()
+
+
+def create_storage(name: Optional[str] = None, **kwargs) -> StorageEngine:
+    name = name or CRAWLER_CONFIG.get("storage", {}).get("engine", "json")
+    if name not in ENGINES:
+        raise ValueError(f"未知的存储引擎: {name}")
+    return ENGINES[name](**kwargs)
+
+
+def get_storage() -> StorageEngine:
+    """获取进程级存储引擎，按配置中的 storage.engine 创建"""
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = create_storage()
+                # 进程退出前将未落盘的写入刷新到磁盘
+                atexit.register(_storage.close)
+    return _storage
+
+
+def site_display_names() -> Dict[str, str]:
+    """文件名中的站点名到站点显示名称的映射"""
+    return {file_site_name(config["name"]): config["name"] for config in NEWS_SITES.values()}
+
+
+def iter_json_files(data_dir: str) -> Iterable:
+    """遍历数据目录中的文章文件，返回 (站点名, 日期, 路径)"""
+    for name in sorted(os.listdir(data_dir)):
+        match = FILE_PATTERN.match(name)
+        if match:
+            yield match.group("site"), match.group("date"), os.path.join(data_dir, name)
+
+
+def migrate_json(target: StorageEngine, data_dir: str = DATA_DIR) -> Dict[str, int]:
+    """将数据目录中的JSON文件导入目标存储引擎，返回导入的文件数和文章数"""
+    names = site_display_names()
+    result = {"files": 0, "articles": 0, "failed": 0}
+    for site_key, date, path in iter_json_files(data_dir):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                articles = json.load(f)
+            site = names.get(site_key, site_key)
+            target.save(site, fill_source(articles, site), date=date)
+            result["files"] += 1
+            result["articles"] += len(articles)
+            print(f"已导入 {path}: {len(articles)} 篇文章")
+        except Exception as e:
+            result["failed"] += 1
+            print(f"导入 {path} 失败: {str(e)}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="文章存储管理")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    migrate_parser = subparsers.add_parser("migrate", help="将JSON文件导入SQLite数据库")
+    migrate_parser.add_argument("--data-dir", default=DATA_DIR, help="JSON文件所在目录")
+    migrate_parser.add_argument("--db-path", default=None, help="SQLite数据库路径，默认使用配置中的db_path")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        target = SqliteStorage(db_path=args.db_path)
+        result = migrate_json(target, args.data_dir)
+        target.close()
+        print(f"迁移完成: {result['files']} 个文件, {result['articles']} 篇文章, {result['failed']} 个失败")
+
+
+if __name__ == "__main__":
+    main()
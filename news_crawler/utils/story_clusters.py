@@ -0,0 +1,230 @@
+"""
+跨站点新闻聚类，将不同站点报道的同一事件（例如同一篇通讯社稿件）归为一个故事
+
+每篇文章保存时根据标题、摘要和正文的词组（shingle）计算MinHash签名，写入 "minhash" 字段，
+字段值以签名文本的摘要开头，文本未变化时再次保存不重新计算；
+聚类时将签名切分为 bands 段、每段 rows 个值（LSH banding），只比较至少有一段完全相同的文章，
+签名估计的Jaccard相似度不低于 threshold 的文章用并查集合并为同一个故事。
+不相关的文章几乎不会落入同一个桶，聚类的比较次数与文章数近似线性。
+"""
+import base64
+import hashlib
+import re
+import struct
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from ..config.config import CRAWLER_CONFIG
+
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+VALUE_MASK = (1 << 32) - 1
+# 空桶借用右侧第 n 个非空桶的值时加上 n * ROTATION_OFFSET（取低32位），避免与该桶的值相同
+ROTATION_OFFSET = 0x9E3779B1
+
+Signature = Tuple[int, ...]
+
+
+def shingles(text: str, size: int = 3, max_words: int = 400) -> List[str]:
+    """将文本切分为连续 size 个词组成的词组，文本不足 size 个词时整体作为一个词组"""
+    words = WORD_PATTERN.findall(text.lower())[:max_words]
+    if len(words) <= size:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+def minhash(features: Iterable[str], num_perm: int = 64) -> Optional[Signature]:
+    """计算特征集合的MinHash签名，没有特征时返回 None
+
+    使用单次哈希（one permutation hashing）：每个特征只计算一次哈希，按哈希值分到 num_perm 个桶，
+    每个桶取最小值；特征较少时的空桶按顺时针方向借用最近的非空桶（rotation densification）。
+    """
+    mins: List[Optional[int]] = [None] * num_perm
+    for feature in set(features):
+        value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        slot, value = value % num_perm, (value // num_perm) & VALUE_MASK
+        if mins[slot] is None or value < mins[slot]:
+            mins[slot] = value
+    if all(value is None for value in mins):
+        return None
+
+    signature = list(mins)
+    for slot in range(num_perm):
+        distance = 1
+        while signature[slot] is None:
+            borrowed = mins[(slot + distance) % num_perm]
+            if borrowed is not None:
+                signature[slot] = (borrowed + distance * ROTATION_OFFSET) & VALUE_MASK
+            distance += 1
+    return tuple(signature)
+
+
+def encode_signature(signature: Signature, digest: str = "") -> str:
+    encoded = base64.b64encode(struct.pack(f">{len(signature)}I", *signature)).decode("ascii")
+    return f"{digest}:{encoded}" if digest else encoded
+
+
+def decode_signature(value: str) -> Signature:
+    # 旧数据只有签名，没有文本摘要前缀（base64中不会出现冒号）
+    raw = base64.b64decode(value.rpartition(":")[2])
+    return struct.unpack(f">{len(raw) // 4}I", raw)
+
+
+def article_text(article: Dict) -> str:
+    """参与签名计算的文本，正文回退为摘要时不重复计入"""
+    parts = [article.get("title") or "", article.get("summary") or ""]
+    content = article.get("content") or ""
+    if content and content != parts[1]:
+        parts.append(content)
+    return "\n".join(parts)
+
+
+def signature_size(config: Dict) -> int:
+    return config.get("bands", 16) * config.get("rows", 4)
+
+
+def text_digest(text: str, config: Dict) -> str:
+    """签名文本和签名参数的摘要，两者都不变时签名不变"""
+    params = f"{config.get('shingle_size', 3)},{config.get('max_words', 400)},{signature_size(config)}\n"
+    return hashlib.blake2b((params + text).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def compute_signature(article: Dict, config: Dict = None, text: str = None) -> Optional[Signature]:
+    config = config or CRAWLER_CONFIG.get("clustering", {})
+    text = article_text(article) if text is None else text
+    features = shingles(text, config.get("shingle_size", 3), config.get("max_words", 400))
+    return minhash(features, signature_size(config))
+
+
+def article_signature(article: Dict) -> Optional[Signature]:
+    """文章的MinHash签名，优先使用保存时写入的 "minhash" 字段，长度与配置不符时重新计算"""
+    config = CRAWLER_CONFIG.get("clustering", {})
+    saved = article.get("minhash")
+    if saved:
+        try:
+            signature = decode_signature(saved)
+            if len(signature) == signature_size(config):
+                return signature
+        except (TypeError, ValueError, struct.error):
+            pass
+    return compute_signature(article, config)
+
+
+def sign_articles(articles: Iterable[Dict]) -> None:
+    """写入前为文章计算签名，已有签名且签名文本未变化的文章不重新计算"""
+    config = CRAWLER_CONFIG.get("clustering", {})
+    if not config.get("enabled", True):
+        return
+    for article in articles:
+        text = article_text(article)
+        digest = text_digest(text, config)
+        if (article.get("minhash") or "").startswith(digest + ":"):
+            continue
+        signature = compute_signature(article, config, text)
+        if signature is None:
+            article.pop("minhash", None)
+        else:
+            article["minhash"] = encode_signature(signature, digest)
+
+
+def signature_id(signature: Optional[Signature]) -> Optional[str]:
+    """签名的短标识，用作故事编号"""
+    if signature is None:
+        return None
+    return hashlib.blake2b(struct.pack(f">{len(signature)}I", *signature), digest_size=8).hexdigest()
+
+
+class UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a: int, b: int):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            # 编号小的作为根，保证每个故事的根是排序最靠前的文章
+            if root_a < root_b:
+                self.parent[root_b] = root_a
+            else:
+                self.parent[root_a] = root_b
+
+
+class StoryClusterer:
+    """按MinHash签名对文章聚类
+
+    bands/rows  签名切分的段数和每段的值个数，相似度约为 (1/bands)^(1/rows) 的文章有一半概率成为候选
+    threshold   候选文章签名估计的Jaccard相似度不低于该值时视为同一故事
+    """
+
+    def __init__(self, bands: int = None, rows: int = None, threshold: float = None):
+        config = CRAWLER_CONFIG.get("clustering", {})
+        self.bands = bands or config.get("bands", 16)
+        self.rows = rows or config.get("rows", 4)
+        self.threshold = config.get("threshold", 0.5) if threshold is None else threshold
+
+    def similarity(self, a: Signature, b: Signature) -> float:
+        return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+    def cluster(self, signatures: Sequence[Optional[Signature]]) -> List[int]:
+        """返回每个签名所属故事的根下标（故事中下标最小的签名）
+
+        空签名（文本为空）和长度不符的签名不与任何文章合并。
+        """
+        size = self.bands * self.rows
+        groups = UnionFind(len(signatures))
+        buckets: Dict[tuple, List[int]] = {}
+        for index, signature in enumerate(signatures):
+            if signature is None or len(signature) != size:
+                continue
+            for band in range(self.bands):
+                key = (band, signature[band * self.rows:(band + 1) * self.rows])
+                bucket = buckets.setdefault(key, [])
+                for other in bucket:
+                    # 已经在同一故事中的文章不必再比较
+                    if groups.find(other) != groups.find(index) and \
+                            self.similarity(signatures[other], signature) >= self.threshold:
+                        groups.union(other, index)
+                bucket.append(index)
+        return [groups.find(index) for index in range(len(signatures))]
+
+
+class StoryIndex:
+    """按日期缓存所有站点文章的故事划分，任一站点的数据变化后重新聚类
+
+    聚类结果写入预排序列表的条目（cluster_id、cluster_size），故事编号取故事中排序最靠前的文章的签名标识。
+    最多缓存 max_dates 天，超出时淘汰最久未使用的日期。
+    """
+
+    def __init__(self, clusterer: StoryClusterer = None, max_dates: int = None):
+        self.clusterer = clusterer or StoryClusterer()
+        self.max_dates = max_dates or CRAWLER_CONFIG.get("clustering", {}).get("max_dates", 8)
+        self._cached: "OrderedDict[Optional[str], tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def assign(self, lists: Sequence[Sequence], date: Optional[str] = None):
+        """为各站点的预排序列表分配故事编号，lists 中每个条目需要有 signature 和 key 属性"""
+        identity = tuple(id(entries) for entries in lists)
+        with self._lock:
+            cached = self._cached.get(date)
+            if cached is not None and cached[0] == identity:
+                self._cached.move_to_end(date)
+                return
+            # 按重要性排序，重要性相同时靠前站点的文章在前，与查询结果的顺序一致
+            entries = sorted((entry for entries in lists for entry in entries), key=lambda entry: entry.key)
+            roots = self.clusterer.cluster([entry.signature for entry in entries])
+            sizes: Dict[int, int] = {}
+            for root in roots:
+                sizes[root] = sizes.get(root, 0) + 1
+            for index, (entry, root) in enumerate(zip(entries, roots)):
+                entry.cluster_id = signature_id(entries[root].signature) or f"n{index}"
+                entry.cluster_size = sizes[root]
+            # 保留列表引用，避免列表被回收后 id 被复用
+            self._cached[date] = (identity, lists)
+            self._cached.move_to_end(date)
+            while len(self._cached) > self.max_dates:
+                self._cached.popitem(last=False)